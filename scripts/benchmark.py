@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fetch, parse, clean, sort and render stages on fixed payloads.
+
+Payloads are generated deterministically, so runs can be compared between versions
+without network access: a small package, and a boto3-scale package with thousands of
+releases. Real documents can be recorded once with `--record` and added with `--fixture`.
+
+Usage:
+    uv run python scripts/benchmark.py
+    uv run python scripts/benchmark.py --json bench.json
+    uv run python scripts/benchmark.py --compare bench.json
+    uv run python scripts/benchmark.py --record boto3 --fixture fixtures/boto3.json.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import contextlib
+from datetime import datetime, timedelta, timezone
+import gzip
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import json
+from pathlib import Path
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any
+import urllib.request
+
+from whatsonpypi import __version__
+from whatsonpypi.client import WoppClient, WoppResponse
+from whatsonpypi.transports import make_response
+from whatsonpypi.utils import _HAS_IJSON, clean_response, pretty
+from whatsonpypi.whatsonpypi import get_output, process_response
+
+# name: (releases, files per release)
+SYNTHETIC: dict[str, tuple[int, int]] = {
+    "small": (25, 2),
+    "boto3-scale": (2000, 2),
+}
+DESCRIPTION = "An example package description with a few paragraphs of text.\n\n" * 120
+
+
+def make_file(name: str, version: str, uploaded: datetime, wheel: bool) -> dict[str, Any]:
+    filename = f"{name}-{version}-py3-none-any.whl" if wheel else f"{name}-{version}.tar.gz"
+    digest = hashlib.sha256(filename.encode("utf-8")).hexdigest()
+    return {
+        "comment_text": "",
+        "digests": {"blake2b_256": digest, "md5": digest[:32], "sha256": digest},
+        "downloads": -1,
+        "filename": filename,
+        "has_sig": False,
+        "md5_digest": digest[:32],
+        "packagetype": "bdist_wheel" if wheel else "sdist",
+        "python_version": "py3" if wheel else "source",
+        "requires_python": ">=3.9",
+        "size": 139_000 if wheel else 111_000,
+        "upload_time": uploaded.strftime("%Y-%m-%dT%H:%M:%S"),
+        "upload_time_iso_8601": uploaded.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "url": f"https://files.pythonhosted.org/packages/{digest[:2]}/{digest[2:4]}/{filename}",
+        "yanked": False,
+        "yanked_reason": None,
+    }
+
+
+def make_document(name: str, n_releases: int, files_per_release: int) -> dict[str, Any]:
+    """
+    Returns a PyPI project document shaped like the real thing.
+    """
+    start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    releases = {}
+    for i in range(n_releases):
+        version = f"1.{i // 100}.{i % 100}"
+        uploaded = start + timedelta(hours=30 * i)
+        releases[version] = [
+            make_file(name, version, uploaded, wheel=j == 0) for j in range(files_per_release)
+        ]
+    latest = next(reversed(releases))
+    return {
+        "info": {
+            "author": "Example Author",
+            "author_email": "author@example.org",
+            "classifiers": [f"Programming Language :: Python :: 3.{v}" for v in range(9, 14)],
+            "description": DESCRIPTION,
+            "description_content_type": "text/x-rst",
+            "home_page": f"https://github.com/example/{name}",
+            "license": "Apache License 2.0",
+            "name": name,
+            "package_url": f"https://pypi.org/project/{name}/",
+            "project_url": f"https://pypi.org/project/{name}/",
+            "project_urls": {
+                "Documentation": f"https://{name}.readthedocs.io/",
+                "Source": f"https://github.com/example/{name}",
+            },
+            "release_url": f"https://pypi.org/project/{name}/{latest}/",
+            "requires_dist": ["botocore<1.40.0,>=1.39.0", "jmespath<2.0.0,>=0.7.1"],
+            "requires_python": ">=3.9",
+            "summary": "An example package",
+            "version": latest,
+            "yanked": False,
+        },
+        "last_serial": 1,
+        "releases": releases,
+        "urls": releases[latest],
+        "vulnerabilities": [],
+    }
+
+
+def load_fixture(path: Path) -> bytes:
+    data = path.read_bytes()
+    return gzip.decompress(data) if path.suffix == ".gz" else data
+
+
+def record(package: str, path: Path) -> None:
+    """
+    Saves the current PyPI document of `package` as a gzipped fixture.
+    """
+    url = f"https://pypi.org/pypi/{package}/json"
+    with urllib.request.urlopen(url, timeout=30) as response:
+        body = response.read()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(gzip.compress(body))
+    print(f"Recorded {package} ({len(body) / 1024:.0f} KB) to {path}")
+
+
+@contextlib.contextmanager
+def serve(body: bytes) -> Any:
+    """
+    Serves `body` for every GET on a loopback HTTP server, yielding its base URL.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/pypi"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def streaming_response(body: bytes) -> Any:
+    response = make_response("https://pypi.org/pypi/bench/json", 200)
+    response.raw = io.BytesIO(body)
+    response._content = False
+    response._content_consumed = False
+    return response
+
+
+def measure(func: Callable[[], Any], repeat: int) -> dict[str, float]:
+    """
+    Times `func`, then runs it once more under tracemalloc for its peak memory.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "min_ms": min(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def bench_payload(body: bytes, repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Benchmarks every stage on one payload.
+    """
+    url = "https://pypi.org/pypi/bench/json"
+    cleaned = clean_response(make_response(url, 200, body)).cleaned_json
+
+    def render() -> None:
+        response = WoppResponse(200, cleaned)
+        with contextlib.redirect_stdout(io.StringIO()):
+            pretty(get_output(response, more_out=True))
+            pretty(process_response(response, False, False, False, history=50) or {})
+
+    stages: dict[str, Callable[[], Any]] = {
+        "parse": lambda: json.loads(body),
+        "clean": lambda: clean_response(make_response(url, 200, body)),
+    }
+    if _HAS_IJSON:
+        stages["clean-stream"] = lambda: clean_response(streaming_response(body))
+    stages["sort"] = lambda: WoppResponse(200, cleaned).get_sorted_releases()
+    stages["render"] = render
+
+    results = {name: measure(func, repeat) for name, func in stages.items()}
+
+    with serve(body) as base_url:
+        client = WoppClient(request_hooks={"response": clean_response}, base_url=base_url)
+        results["fetch"] = measure(lambda: client.request("bench"), repeat)
+        client.transport.close()
+    return results
+
+
+def print_results(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]] | None = None,
+) -> None:
+    header = f"{'payload':<14} {'stage':<13} {'min ms':>10} {'median ms':>10} {'peak KB':>10}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    for payload, stages in results.items():
+        for stage, numbers in stages.items():
+            line = (
+                f"{payload:<14} {stage:<13} {numbers['min_ms']:>10.2f}"
+                f" {numbers['median_ms']:>10.2f} {numbers['peak_kb']:>10.0f}"
+            )
+            before = (baseline or {}).get(payload, {}).get(stage)
+            if before:
+                line += f" {numbers['median_ms'] / before['median_ms']:>7.2f}x"
+            print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage")
+    parser.add_argument(
+        "--fixture",
+        action="append",
+        default=[],
+        type=Path,
+        help="recorded payload (.json or .json.gz) to benchmark too",
+    )
+    parser.add_argument("--only-fixtures", action="store_true", help="skip synthetic payloads")
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    parser.add_argument("--compare", type=Path, help="results file of an earlier run")
+    parser.add_argument("--record", metavar="PACKAGE", help="record a PyPI document to --fixture")
+    args = parser.parse_args()
+
+    if args.record:
+        if len(args.fixture) != 1:
+            parser.error("--record needs exactly one --fixture path to write to")
+        record(args.record, args.fixture[0])
+        return
+
+    payloads: dict[str, bytes] = {}
+    if not args.only_fixtures:
+        for name, (n_releases, files) in SYNTHETIC.items():
+            payloads[name] = json.dumps(make_document(name, n_releases, files)).encode("utf-8")
+    for path in args.fixture:
+        payloads[path.name.split(".")[0]] = load_fixture(path)
+
+    results = {}
+    for name, body in payloads.items():
+        print(f"Benchmarking {name} ({len(body) / 1024:.0f} KB)...", file=sys.stderr)
+        results[name] = bench_payload(body, args.repeat)
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+    print_results(results, baseline)
+
+    if args.json:
+        report = {
+            "whatsonpypi": __version__,
+            "python": platform.python_version(),
+            "ijson": _HAS_IJSON,
+            "results": results,
+        }
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
+from __future__ import annotations
+
 from collections.abc import Generator
+import json
+from pathlib import Path
+from typing import Any
 
 import pytest
 
@@ -13,3 +18,51 @@ def do_cleanup() -> None:
 def cleanup() -> Generator[None, None, None]:
     yield
     do_cleanup()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the on-disk response cache out of the user's home directory."""
+    cache_dir = tmp_path / "wopp-cache"
+    monkeypatch.setenv("WOPP_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+class Mirror:
+    """
+    A directory mirror for `--offline`, laid out like the JSON API: `<name>/json` for
+    a project, and `<name>/<version>/json` for one of its releases.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+    def add(
+        self,
+        name: str,
+        info: dict[str, Any] | None = None,
+        releases: dict[str, list[dict[str, Any]]] | None = None,
+        urls: list[dict[str, Any]] | None = None,
+        version: str | None = None,
+    ) -> None:
+        """
+        Writes the document of a project, or of its release `version` if given.
+        `info` is laid over {"name": name, "version": version or "1.0"}.
+        """
+        document = {
+            "info": {"name": name, "version": version or "1.0", **(info or {})},
+            "releases": releases or {},
+            "urls": urls or [],
+        }
+        directory = self.path / name if version is None else self.path / name / version
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "json").write_text(json.dumps(document))
+
+
+@pytest.fixture
+def mirror(tmp_path: Path) -> Mirror:
+    """An empty offline mirror; see `Mirror.add`."""
+    return Mirror(tmp_path / "mirror")
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from click.testing import CliRunner
+import pytest
+
+from tests.conftest import Mirror
+from whatsonpypi.artifacts import file_rows, hash_file, parse_artifact_filename, verify_file
+from whatsonpypi.cli import main
+from whatsonpypi.client import WoppResponse
+from whatsonpypi.transports import make_response
+from whatsonpypi.utils import clean_response
+
+
+def pypi_file(filename: str, content: bytes, **extra: Any) -> dict[str, Any]:
+    return {
+        "filename": filename,
+        "packagetype": "bdist_wheel" if filename.endswith(".whl") else "sdist",
+        "python_version": "py3",
+        "size": len(content),
+        "upload_time_iso_8601": "2024-01-01T00:00:00.000000Z",
+        "yanked": False,
+        "digests": {
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "blake2b_256": hashlib.blake2b(content, digest_size=32).hexdigest(),
+            "md5": hashlib.md5(content).hexdigest(),  # noqa: S324
+        },
+        **extra,
+    }
+
+
+def release_document(*files: dict[str, Any]) -> dict[str, Any]:
+    return {"info": {"name": "demo", "version": "1.0"}, "urls": list(files)}
+
+
+def release_response(*files: dict[str, Any]) -> WoppResponse:
+    body = json.dumps(release_document(*files)).encode("utf-8")
+    cleaned = clean_response(make_response("https://pypi.org/pypi/demo/1.0/json", 200, body))
+    return WoppResponse(200, cleaned.cleaned_json)
+
+
+@pytest.mark.parametrize("size", [0, 1, 4096, 10_000])
+def test_hash_file_in_chunks(tmp_path: Path, size: int) -> None:
+    content = bytes(range(256)) * (size // 256) + b"x" * (size % 256)
+    path = tmp_path / "artifact.bin"
+    path.write_bytes(content)
+
+    digests = hash_file(path, ("sha256", "blake2b_256", "md5"), chunk_size=1024)
+    assert digests == {
+        "sha256": hashlib.sha256(content).hexdigest(),
+        "blake2b_256": hashlib.blake2b(content, digest_size=32).hexdigest(),
+        "md5": hashlib.md5(content).hexdigest(),  # noqa: S324
+    }
+
+
+@pytest.mark.parametrize(
+    ("filename", "expected"),
+    [
+        ("demo_pkg-1.0-py3-none-any.whl", ("demo-pkg", "1.0")),
+        ("demo-pkg-2.0rc1.tar.gz", ("demo-pkg", "2.0rc1")),
+        ("notes.txt", None),
+    ],
+)
+def test_parse_artifact_filename(filename: str, expected: tuple[str, str] | None) -> None:
+    assert parse_artifact_filename(Path("dist") / filename) == expected
+
+
+def test_clean_response_keeps_every_file() -> None:
+    files = [
+        pypi_file("demo-1.0.tar.gz", b"sdist"),
+        pypi_file("demo-1.0-py3-none-any.whl", b"wheel", yanked=True, yanked_reason="broken"),
+    ]
+    body = json.dumps(release_document(*files)).encode("utf-8")
+    cleaned = clean_response(make_response("https://pypi.org/pypi/demo/1.0/json", 200, body))
+    response = WoppResponse(200, cleaned.cleaned_json)
+
+    assert [f["filename"] for f in response.files] == [
+        "demo-1.0.tar.gz",
+        "demo-1.0-py3-none-any.whl",
+    ]
+    assert response.files[1]["sha256"] == hashlib.sha256(b"wheel").hexdigest()
+    assert file_rows(response)[1]["yanked"] == "broken"
+    assert file_rows(response)[0]["size"] == "5.00 B"
+
+
+def test_verify_file(tmp_path: Path) -> None:
+    wheel = tmp_path / "demo-1.0-py3-none-any.whl"
+    wheel.write_bytes(b"wheel")
+    response = release_response(pypi_file(wheel.name, b"wheel"))
+
+    row = verify_file(wheel, response)
+    assert row["status"] == "ok"
+    assert row["matches"] == wheel.name
+    assert set(row) >= {"sha256", "blake2b_256"}
+
+    wheel.write_bytes(b"tampered")
+    assert verify_file(wheel, response)["status"] == "mismatch"
+
+
+def test_cli_verify(tmp_path: Path, mirror: Mirror) -> None:
+    wheel = tmp_path / "demo-1.0-py3-none-any.whl"
+    wheel.write_bytes(b"wheel")
+    mirror.add("demo", urls=[pypi_file(wheel.name, b"wheel")], version="1.0")
+
+    runner = CliRunner()
+    options = ["--offline", str(mirror), "--format", "ndjson"]
+    result = runner.invoke(main, [*options, "--verify", str(wheel)])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["status"] == "ok"
+
+    stray = tmp_path / "stray.bin"
+    stray.write_bytes(b"wheel")
+    result = runner.invoke(main, [*options, "--verify", str(stray)])
+    assert result.exit_code == 2
+    result = runner.invoke(main, [*options, "demo==1.0", "--verify", str(stray)])
+    assert result.exit_code == 0
+
+    # the filename's version wins over the latest release of a package argument
+    mirror.add("demo", {"version": "2.0"}, urls=[pypi_file("demo-2.0-py3-none-any.whl", b"other")])
+    result = runner.invoke(main, [*options, "demo", "--verify", str(wheel)])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["release"] == "demo 1.0"
+
+    wheel.write_bytes(b"tampered")
+    result = runner.invoke(main, [*options, "--verify", str(wheel)])
+    assert result.exit_code == 1
+    assert "1 of 1 files don't match" in result.stderr
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from whatsonpypi.async_client import AsyncWoppClient
+from whatsonpypi.client import WoppResponse
+from whatsonpypi.exceptions import PackageNotFoundError, WoppError
+from whatsonpypi.utils import clean_response
+
+httpx = pytest.importorskip("httpx")
+
+
+def test_async_request_returns_wopp_response() -> None:
+    async def _run() -> WoppResponse:
+        async with AsyncWoppClient(request_hooks={"response": clean_response}) as client:
+            return await client.request("requests")
+
+    response = asyncio.run(_run())
+    assert response.status_code == 200
+    assert response.name.lower() == "requests"
+    assert response.get_latest_releases()
+
+
+def test_async_request_many_preserves_order() -> None:
+    async def _run() -> list[WoppResponse | WoppError]:
+        async with AsyncWoppClient(request_hooks={"response": clean_response}) as client:
+            return await client.request_many(
+                ["rich", "this-package-does-not-exist-1234", ("click", None)]
+            )
+
+    results = asyncio.run(_run())
+    assert isinstance(results[0], WoppResponse) and results[0].name == "rich"
+    assert isinstance(results[1], PackageNotFoundError)
+    assert isinstance(results[2], WoppResponse) and results[2].name == "click"
+
+
+def test_async_request_retries_server_errors() -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"info": {"name": "demo", "version": "1.0"}})
+
+    async def _run() -> WoppResponse:
+        client = AsyncWoppClient(
+            request_hooks={"response": clean_response}, transport=httpx.MockTransport(handler)
+        )
+        async with client:
+            return await client.request("demo", max_retries=3)
+
+    response = asyncio.run(_run())
+    assert len(calls) == 3
+    assert response.name == "demo"
+    assert response.latest_version == "1.0"
+
+
+def test_async_request_gives_up_after_max_retries() -> None:
+    async def _run() -> WoppResponse:
+        client = AsyncWoppClient(
+            transport=httpx.MockTransport(lambda _request: httpx.Response(500))
+        )
+        async with client:
+            return await client.request("demo", max_retries=1)
+
+    with pytest.raises(PackageNotFoundError):
+        asyncio.run(_run())
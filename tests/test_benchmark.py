@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+from pathlib import Path
+from types import ModuleType
+
+SCRIPT = Path(__file__).parent.parent / "scripts" / "benchmark.py"
+
+
+def load_benchmark() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("benchmark", SCRIPT)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_benchmark_runs_every_stage() -> None:
+    benchmark = load_benchmark()
+    document = benchmark.make_document("demo", 5, 2)
+    assert len(document["releases"]) == 5
+    assert document["urls"] == document["releases"]["1.0.4"]
+
+    results = benchmark.bench_payload(json.dumps(document).encode("utf-8"), repeat=1)
+    assert {"parse", "clean", "sort", "render", "fetch"} <= set(results)
+    for numbers in results.values():
+        assert numbers["median_ms"] >= 0
+        assert numbers["peak_kb"] > 0
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+from requests import PreparedRequest, Response
+
+from whatsonpypi import cache as cache_module
+from whatsonpypi.cache import CacheEntry, DiskCache, MemoryCache, default_cache_dir
+from whatsonpypi.client import WoppClient, WoppResponse
+from whatsonpypi.timings import RequestTimings
+from whatsonpypi.transports import CallableTransport
+from whatsonpypi.utils import clean_response
+
+BODY = json.dumps({"info": {"name": "demo", "version": "1.0"}}).encode("utf-8")
+CLEANED = {"name": "demo", "latest_version": "1.0"}
+
+
+def test_default_cache_dir_honours_env(isolated_cache_dir: Path) -> None:
+    assert default_cache_dir() == isolated_cache_dir
+
+
+def test_set_and_get_round_trip(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path)
+    cache.set("https://example.org/demo/json", CacheEntry(CLEANED, '"abc"', "yesterday"))
+
+    entry = cache.get("https://example.org/demo/json")
+    assert entry is not None
+    assert entry.data == CLEANED
+    assert entry.validators == {"If-None-Match": '"abc"', "If-Modified-Since": "yesterday"}
+    assert cache.get("https://example.org/other/json") is None
+
+
+def test_entry_freshness() -> None:
+    assert CacheEntry(CLEANED).is_fresh(60)
+    assert not CacheEntry(CLEANED, stored_at=0).is_fresh(60)
+    assert not CacheEntry(CLEANED).is_fresh(0)
+
+
+def test_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path)
+    cache.set("a", CacheEntry(CLEANED))
+    # room for two entries, not three
+    cache.max_size = next(tmp_path.iterdir()).stat().st_size * 5 // 2
+    cache.set("b", CacheEntry(CLEANED))
+    # make "a" the oldest, then use it so "b" becomes the eviction candidate
+    for path in tmp_path.iterdir():
+        os.utime(path, (0, 0))
+    assert cache.get("a") is not None
+    cache.set("c", CacheEntry(CLEANED))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_writes_only_scan_when_over_size(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = DiskCache(tmp_path)
+    cache.set("a", CacheEntry(CLEANED))
+    scans = []
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or [])
+    for key in "bcdef":
+        cache.set(key, CacheEntry(CLEANED))
+    assert not scans
+
+    cache.max_size = 1
+    cache.set("g", CacheEntry(CLEANED))
+    assert len(scans) == 1
+
+
+def test_entries_from_other_schema_versions_are_misses(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = DiskCache(tmp_path)
+    cache.set("a", CacheEntry(CLEANED))
+    monkeypatch.setattr(cache_module, "SCHEMA_VERSION", cache_module.SCHEMA_VERSION + 1)
+    assert cache.get("a") is None
+
+
+class FakeSend:
+    """Stands in for Session.send, answering with canned status codes."""
+
+    def __init__(self, *statuses: int) -> None:
+        self.statuses = list(statuses)
+        self.requests: list[PreparedRequest] = []
+
+    def __call__(self, request: PreparedRequest, **_kwargs: Any) -> Response:
+        self.requests.append(request)
+        response = Response()
+        response.status_code = self.statuses.pop(0)
+        response.url = request.url or ""
+        response._content = b""
+        response._content_consumed = True
+        if response.status_code == 200:
+            response._content = BODY
+            response.headers["ETag"] = '"v1"'
+        return clean_response(response)
+
+
+def test_client_revalidates_stale_entries(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = WoppClient(request_hooks={"response": clean_response}, cache=DiskCache(tmp_path))
+    send = FakeSend(200, 304)
+    monkeypatch.setattr(client.session, "send", send)
+
+    assert client.request("demo").name == "demo"
+    # fresh entry: served without a request
+    assert client.request("demo").name == "demo"
+    assert len(send.requests) == 1
+
+    client.cache.ttl = 0  # type: ignore[union-attr]
+    response = client.request("demo")
+    assert len(send.requests) == 2
+    assert send.requests[1].headers["If-None-Match"] == '"v1"'
+    assert response.status_code == 200
+    assert response.latest_version == "1.0"
+
+
+def test_projections_are_cached_apart(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = WoppClient(request_hooks={"response": clean_response}, cache=DiskCache(tmp_path))
+    send = FakeSend(200, 200)
+    monkeypatch.setattr(client.session, "send", send)
+
+    client.request("demo", sections={"info"})
+    client.request("demo")
+    client.request("demo", sections={"info"})
+    assert len(send.requests) == 2
+
+
+def test_memory_cache_evicts_least_recently_used() -> None:
+    cache = MemoryCache(max_entries=2)
+    responses = {key: WoppResponse(200, {"name": key}) for key in "abc"}
+    cache.set("a", responses["a"])
+    cache.set("b", responses["b"])
+    assert cache.get("a") is responses["a"]
+    cache.set("c", responses["c"])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is responses["a"]
+    assert cache.stats() == {"entries": 2, "bytes": 0, "hits": 2, "misses": 1, "evictions": 1}
+
+
+def test_memory_cache_limits_bytes_and_age() -> None:
+    response = WoppResponse(200, CLEANED)
+    size = len(response.encoded())
+    cache = MemoryCache(max_bytes=size * 2)
+    for key in "abc":
+        cache.set(key, response)
+    assert len(cache) == 2
+    assert cache.size == size * 2
+    # too big to be kept at all
+    cache.set("big", WoppResponse(200, {"data": "x" * size * 2}))
+    assert cache.get("big") is None
+
+    cache.ttl = 0
+    assert cache.get("b") is None
+    assert cache.size == size
+
+
+def test_client_memory_cache_shares_responses() -> None:
+    calls: list[str] = []
+
+    def handler(url: str, _headers: Any) -> tuple[int, bytes | None]:
+        calls.append(url)
+        return 200, BODY
+
+    reported: list[RequestTimings] = []
+    client = WoppClient(
+        request_hooks={"response": clean_response},
+        transport=CallableTransport(handler),
+        timing_hook=reported.append,
+        memory_cache=MemoryCache(),
+    )
+    first = client.request("demo")
+    assert client.request("demo") is first
+    projected = client.request("demo", sections={"info"})
+    assert projected is not first
+    assert client.request("demo", version="1.0") is not first
+    assert len(calls) == 3
+    assert [timings.cache for timings in reported] == ["off", "memory", "off", "off"]
+
+    # names are compared in their canonical form
+    assert client.request("Demo") is first
+    assert len(calls) == 3
+
+    # the project and its projections, but not the release
+    assert client.invalidate("DEMO") == 2
+    assert client.request("demo", sections={"info"}) is not projected
+    assert len(calls) == 4
+    assert WoppClient().invalidate("demo") == 0
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import json
+from pathlib import Path
+import subprocess
+import sys
+
 from click.testing import CliRunner
 import pytest
 
+from tests.conftest import Mirror
 from whatsonpypi import __version__, cli
 
 
@@ -72,3 +78,131 @@ def test_invalid_package() -> None:
     result = CliRunner().invoke(cli.main, ["nonexistent_package_12345"])
     assert result.exit_code != 0
     assert "couldn't be found" in result.output.lower()
+
+
+def test_multiple_packages() -> None:
+    result = CliRunner().invoke(cli.main, ["requests", "rich"])
+    assert result.exit_code == 0
+    assert result.output.count("PyPI Package Info") == 2
+
+
+def test_multiple_packages_partial_failure() -> None:
+    result = CliRunner().invoke(cli.main, ["requests", "nonexistent_package_12345"])
+    assert result.exit_code != 0
+    assert "nonexistent_package_12345" in result.output
+    assert "1 of 2 packages" in result.output
+
+
+def test_requirements_scan(tmp_path: Path) -> None:
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("requests==2.0.0\nrich\nnonexistent_package_12345==1.0\n")
+    result = CliRunner().invoke(cli.main, ["-r", str(requirements), "click>=8"])
+    assert result.exit_code == 0
+    assert "outdated" in result.output
+    assert "not found" in result.output
+    assert "click" in result.output
+
+
+def test_missing_packages() -> None:
+    result = CliRunner().invoke(cli.main, [])
+    assert result.exit_code == 2
+    assert "Missing argument" in result.output
+
+
+def test_offline_mirror(mirror: Mirror) -> None:
+    mirror.add("demo", {"version": "1.2.3", "summary": "A mirrored package"}, {"1.2.3": []})
+
+    result = CliRunner().invoke(cli.main, ["--offline", str(mirror), "demo"])
+    assert result.exit_code == 0
+    assert "1.2.3" in result.output
+    assert "A mirrored package" in result.output
+
+
+def test_timings_json(mirror: Mirror) -> None:
+    mirror.add("demo")
+    result = CliRunner().invoke(cli.main, ["--offline", str(mirror), "demo", "--timings", "json"])
+    assert result.exit_code == 0
+    report = json.loads(result.stderr.strip().splitlines()[-1])
+    assert report["requests"][0]["package"] == "demo"
+    assert "render" in report["stages_ms"]
+    assert report["total_ms"] > 0
+
+
+@pytest.mark.parametrize("options", [[], ["--help"], ["--version"]])
+def test_startup_skips_heavy_imports(options: list[str]) -> None:
+    # run in a fresh interpreter, as the test session has imported everything already
+    code = (
+        "import sys\n"
+        "from whatsonpypi import cli\n"
+        f"if {options!r}:\n"
+        f"    cli.main({options!r}, standalone_mode=False)\n"
+        "heavy = ('requests', 'urllib3', 'rich', 'whatsonpypi.client')\n"
+        "sys.stderr.write(','.join(name for name in heavy if name in sys.modules))\n"
+    )
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    assert result.stderr == ""
+
+
+def test_format_ndjson(mirror: Mirror) -> None:
+    mirror.add("demo")
+    result = CliRunner().invoke(
+        cli.main, ["--offline", str(mirror), "demo", "missing", "--format", "ndjson"]
+    )
+    assert result.exit_code == 1
+    records = {r["package"]: r for r in map(json.loads, result.stdout.splitlines())}
+    assert records["demo"]["current_version"] == "1.0"
+    assert "error" in records["missing"]
+    assert "1 of 2 packages could not be fetched" in result.stderr
+
+
+def test_outdated(mirror: Mirror, monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in ("old", "fresh"):
+        mirror.add(name, {"version": "2.0"})
+    pins = [("fresh", "2.0", "=="), ("old", "1.0", "=="), ("local", "0.1", "==")]
+    monkeypatch.setattr("whatsonpypi.requirements.installed_pins", lambda: pins)
+
+    result = CliRunner().invoke(cli.main, ["--offline", str(mirror), "--outdated", "-f", "csv"])
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == [
+        "package,current,latest,status,error",
+        "old,1.0,2.0,outdated,",
+    ]
+
+    result = CliRunner().invoke(cli.main, ["--offline", str(mirror), "--outdated", "fresh"])
+    assert result.exit_code == 0
+    assert "All 1 installed packages are up to date." in result.stderr
+
+
+def test_diff(mirror: Mirror) -> None:
+    for version, license_ in (("1.0", "MIT"), ("2.0", "Apache-2.0")):
+        mirror.add("demo", {"license": license_}, version=version)
+
+    options = ["--offline", str(mirror), "demo", "--diff"]
+    result = CliRunner().invoke(cli.main, [*options, "1.0", "2.0", "--format", "ndjson"])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout) == {
+        "package": "demo",
+        "field": "license",
+        "old": "MIT",
+        "new": "Apache-2.0",
+        "change": "changed",
+    }
+
+    result = CliRunner().invoke(cli.main, [*options, "1.0", "1.0"])
+    assert "No differences between 1.0 and 1.0." in result.stderr
+
+    # extras and pins are not part of the URL
+    for spec in ("demo[extra]", "demo==1.0"):
+        args = ["--offline", str(mirror), spec, "--diff", "1.0", "2.0", "--format", "ndjson"]
+        result = CliRunner().invoke(cli.main, args)
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)["package"] == "demo"
+
+    result = CliRunner().invoke(cli.main, ["demo", "other", "--diff", "1.0", "2.0"])
+    assert result.exit_code == 2
@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+import json
+import threading
+import time
+from typing import Any, ClassVar
+
+import pytest
+from requests import PreparedRequest, Response
+from requests.packages.urllib3.util.retry import Retry
+
+from whatsonpypi.client import WoppClient, WoppResponse
+from whatsonpypi.constants import DEFAULT_MAX_THROTTLE_RETRIES
+from whatsonpypi.exceptions import PackageNotFoundError, RateLimitError
+from whatsonpypi.timings import RequestTimings
+from whatsonpypi.transports import CallableTransport
+from whatsonpypi.utils import clean_response
+
+
+def _ok(request: PreparedRequest, **_kwargs: Any) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.url = request.url or ""
+    response._content = b"{}"
+    response._content_consumed = True
+    return response
+
+
+def test_adapter_is_configured_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = WoppClient(pool_size=4, pool_maxsize=16, retries=5)
+    assert client.session is not None
+    adapter = client.session.get_adapter("https://pypi.org/pypi")
+    assert adapter.max_retries.total == 5
+    assert adapter._pool_connections == 4
+    assert adapter._pool_maxsize == 16
+
+    monkeypatch.setattr(client.session, "send", _ok)
+    client.request("demo")
+    client.request_many(["a", "b"])
+    assert client.session.get_adapter("https://pypi.org/pypi") is adapter
+
+
+def test_accepts_retry_policy() -> None:
+    policy = Retry(total=7, status_forcelist=[429, 502])
+    client = WoppClient(retries=policy)
+    assert client.session is not None
+    retries = client.session.get_adapter("https://pypi.org/pypi").max_retries
+    assert retries.total == 7
+    # 429s are left to the client's rate limiter
+    assert retries.status_forcelist == [502]
+    assert not retries.respect_retry_after_header
+
+
+def test_one_off_retries_leave_shared_session_untouched(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = WoppClient()
+    assert client.session is not None
+    adapter = client.session.get_adapter("https://pypi.org/pypi")
+
+    sessions = []
+
+    def _send(self: Any, request: PreparedRequest, **kwargs: Any) -> Response:
+        sessions.append(self)
+        return _ok(request, **kwargs)
+
+    monkeypatch.setattr("requests.Session.send", _send)
+    client.request("demo", max_retries=1)
+    assert sessions and sessions[0] is not client.session
+    assert sessions[0].get_adapter("https://pypi.org/pypi").max_retries.total == 1
+    assert client.session.get_adapter("https://pypi.org/pypi") is adapter
+
+
+def test_release_records_are_built_on_demand() -> None:
+    response = WoppResponse(
+        200,
+        {
+            "releases": ["1.0", "2.0", "3.0"],
+            "release_files": {
+                "1.0": ["a.whl", 1024, "2020-01-01T00:00:00Z", None, None, False, None],
+                "2.0": ["b.whl", 2048, "2022-01-01T00:00:00Z", None, None, False, None],
+            },
+        },
+    )
+    assert "release_records" not in response._cache
+    assert response.get_sorted_releases() == ["2.0", "1.0"]
+    records = response.get_release_records()
+    assert response.get_release_records() is records
+
+    info = response.get_release_info("2.0")
+    assert info["filename"] == "b.whl"
+    assert info["size"] == "2.00 KB"
+
+    assert response.get_release_info("3.0") == {}
+    assert set(response.release_data) == {"1.0", "2.0"}
+
+
+def test_timing_hook_reports_every_request() -> None:
+    body = b'{"info": {"name": "demo", "version": "1.0"}, "releases": {"1.0": []}}'
+
+    def handler(url: str, _headers: Any) -> tuple[int, bytes | None]:
+        return (200, body) if "/demo/" in url else (404, None)
+
+    reported: list[RequestTimings] = []
+    client = WoppClient(
+        request_hooks={"response": clean_response},
+        transport=CallableTransport(handler),
+        timing_hook=reported.append,
+    )
+    client.request("demo")
+    with pytest.raises(PackageNotFoundError):
+        client.request("missing")
+
+    ok, missing = (timings.to_dict() for timings in reported)
+    assert ok["status_code"] == 200
+    assert ok["bytes"] == len(body)
+    assert ok["cache"] == "off"
+    assert {"request", "parse", "clean"} <= set(ok["stages_ms"])
+    assert ok["elapsed_ms"] >= ok["stages_ms"]["request"]
+    assert missing["status_code"] == 404
+
+
+def test_concurrent_requests_are_coalesced() -> None:
+    body = b'{"info": {"name": "demo", "version": "1.0"}}'
+    calls: list[str] = []
+    release = threading.Event()
+
+    def handler(url: str, _headers: Any) -> tuple[int, bytes | None]:
+        calls.append(url)
+        release.wait(5)
+        return (200, body) if "/demo/" in url else (404, None)
+
+    reported: list[RequestTimings] = []
+    client = WoppClient(
+        request_hooks={"response": clean_response},
+        transport=CallableTransport(handler),
+        timing_hook=reported.append,
+    )
+    results: list[Any] = []
+    batch = threading.Thread(
+        target=lambda: results.extend(
+            client.request_many(["demo", "Demo", "demo", "missing", "missing", ("demo", "1.0")])
+        )
+    )
+    batch.start()
+    time.sleep(0.2)
+    release.set()
+    batch.join()
+
+    # one request each for the project, the missing package and the release
+    assert sorted(calls) == sorted(
+        [client._build_url(*spec) for spec in [("demo", None), ("missing", None), ("demo", "1.0")]]
+    )
+    assert results[0] is results[1] is results[2]
+    assert results[5] is not results[0]
+    assert isinstance(results[3], PackageNotFoundError)
+    assert results[4] is results[3]
+    assert [timings.cache for timings in reported].count("shared") == 3
+    assert not client._in_flight
+
+    # and nothing is shared once the first request is done
+    client.request("demo")
+    assert len(calls) == 4
+
+
+def test_throttled_requests_are_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    body = b'{"info": {"name": "demo", "version": "1.0"}}'
+    answers = [429, 429, 200]
+
+    def handler(url: str, _headers: Any) -> tuple[int, bytes | None]:
+        return (answers.pop(0), body) if "/demo/" in url else (429, None)
+
+    reported: list[RequestTimings] = []
+    client = WoppClient(
+        request_hooks={"response": clean_response},
+        transport=CallableTransport(handler),
+        timing_hook=reported.append,
+    )
+    # no Retry-After, so the backoff would grow from half a second
+    monkeypatch.setattr("whatsonpypi.client.DEFAULT_MAX_RETRY_AFTER", 0.0)
+    assert client.request("demo").latest_version == "1.0"
+    assert reported[-1].retries == 2
+    assert client.rate_limiter.throttled == 2
+
+    with pytest.raises(RateLimitError):
+        client.request("busy")
+    assert reported[-1].status_code == 429
+
+
+def test_failed_sends_give_back_their_slot() -> None:
+    def handler(_url: str, _headers: Any) -> tuple[int, bytes | None]:
+        raise OSError
+
+    client = WoppClient(transport=CallableTransport(handler))
+    for _ in range(3):
+        with pytest.raises(OSError):
+            client.request("demo")
+    assert client.rate_limiter.in_flight == 0
+
+
+def test_iter_many_yields_in_completion_order() -> None:
+    body = b'{"info": {"name": "demo", "version": "1.0"}}'
+    release = threading.Event()
+
+    def handler(url: str, _headers: Any) -> tuple[int, bytes | None]:
+        if "/slow/" in url:
+            release.wait(5)
+        return 200, body
+
+    client = WoppClient(
+        request_hooks={"response": clean_response}, transport=CallableTransport(handler)
+    )
+    results = client.iter_many(["slow", "fast"])
+    assert next(results)[0] == 1
+    release.set()
+    assert next(results)[0] == 0
+    assert client.request_many(["slow", "fast"])[0].latest_version == "1.0"  # type: ignore[union-attr]
+
+
+class _TruncatingHandler(BaseHTTPRequestHandler):
+    body = b'{"info": {"name": "demo", "version": "1.0"}, "releases": {"1.0": []}}'
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        # the connection drops halfway through the body of /trunc/
+        self.wfile.write(self.body[:20] if "/trunc/" in self.path else self.body)
+
+    def log_message(self, *_args: Any) -> None:
+        pass
+
+
+def test_broken_bodies_fail_their_package_only() -> None:
+    server = HTTPServer(("127.0.0.1", 0), _TruncatingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = WoppClient(
+            request_hooks={"response": clean_response},
+            base_url=f"http://127.0.0.1:{server.server_port}",
+        )
+        ok, truncated = client.request_many(["ok", "trunc"])
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert isinstance(ok, WoppResponse)
+    assert ok.latest_version == "1.0"
+    assert isinstance(truncated, PackageNotFoundError)
+
+    client = WoppClient(
+        request_hooks={"response": clean_response},
+        transport=CallableTransport(lambda _url, _headers: (200, b'{"info": {"name"')),
+    )
+    with pytest.raises(PackageNotFoundError):
+        client.request("demo")
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # info first, then enough releases that an info-only parse stops well before the end
+    body = json.dumps(
+        {
+            "info": {"name": "demo", "version": "1.0"},
+            "releases": {f"0.{i}": [{"filename": "x" * 100}] for i in range(5000)},
+        }
+    ).encode("utf-8")
+    connections: ClassVar[set[int]] = set()
+
+    def do_GET(self) -> None:
+        self.connections.add(self.client_address[1])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *_args: Any) -> None:
+        pass
+
+
+def test_partial_reads_keep_the_connection() -> None:
+    pytest.importorskip("ijson")
+    # threaded, as kept-alive connections would otherwise hold up the server
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = WoppClient(
+        request_hooks={"response": clean_response},
+        base_url=f"http://127.0.0.1:{server.server_port}",
+    )
+    try:
+        for _ in range(5):
+            assert client.request("demo", sections={"info"}).latest_version == "1.0"
+    finally:
+        client.transport.close()
+        server.shutdown()
+        server.server_close()
+    assert len(_KeepAliveHandler.connections) == 1
+
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    body = b'{"info": {"name": "demo", "version": "1.0"}}'
+    # status codes to answer with, in order, then 200s
+    answers: ClassVar[list[int]] = []
+    requests: ClassVar[int] = 0
+
+    def do_GET(self) -> None:
+        type(self).requests += 1
+        status = self.answers.pop(0) if self.answers else 200
+        body = self.body if status == 200 else b""
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args: Any) -> None:
+        pass
+
+
+def test_throttling_is_left_to_the_rate_limiter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("whatsonpypi.client.DEFAULT_MAX_RETRY_AFTER", 0.0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ThrottlingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = WoppClient(
+        request_hooks={"response": clean_response},
+        base_url=f"http://127.0.0.1:{server.server_port}",
+    )
+    try:
+        _ThrottlingHandler.answers = [429, 429]
+        assert client.request("demo").latest_version == "1.0"
+        # one request per attempt: urllib3 doesn't retry the 429s behind the limiter's back
+        assert _ThrottlingHandler.requests == 3
+        assert client.rate_limiter.throttled == 2
+
+        _ThrottlingHandler.requests = 0
+        _ThrottlingHandler.answers = [429] * 100
+        with pytest.raises(RateLimitError):
+            client.request("demo")
+        assert _ThrottlingHandler.requests == DEFAULT_MAX_THROTTLE_RETRIES + 1
+    finally:
+        client.transport.close()
+        server.shutdown()
+        server.server_close()
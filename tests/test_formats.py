@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+import pytest
+
+from whatsonpypi.exceptions import PackageNotFoundError
+from whatsonpypi.formats import get_writer, iter_records
+
+RECORDS = [
+    {"package": "missing", "error": "not found"},
+    {"package": "demo", "name": "demo", "dependencies": ["a", "b"], "urls": {"x": "y"}},
+    {"package": "other", "name": "other"},
+]
+
+
+def write(output_format: str) -> str:
+    stream = io.StringIO()
+    writer = get_writer(output_format, stream)
+    for record in RECORDS:
+        writer.write(record)
+    writer.close()
+    return stream.getvalue()
+
+
+def test_json() -> None:
+    assert json.loads(write("json")) == RECORDS
+    writer = get_writer("json", io.StringIO())
+    writer.close()
+    assert json.loads(writer.stream.getvalue()) == []  # type: ignore[attr-defined]
+
+
+def test_ndjson() -> None:
+    lines = write("ndjson").splitlines()
+    assert [json.loads(line) for line in lines] == RECORDS
+
+
+def test_csv_holds_errors_until_the_header_is_known() -> None:
+    rows = list(csv.DictReader(io.StringIO(write("csv"))))
+    assert list(rows[0]) == ["package", "name", "dependencies", "urls", "error"]
+    assert rows[0]["error"] == "not found"
+    assert json.loads(rows[1]["dependencies"]) == ["a", "b"]
+    assert rows[2]["name"] == "other"
+
+
+def test_csv_with_only_errors() -> None:
+    stream = io.StringIO()
+    writer = get_writer("csv", stream)
+    writer.write(RECORDS[0])
+    writer.close()
+    assert stream.getvalue().splitlines() == ["package,error", "missing,not found"]
+
+
+@pytest.mark.parametrize(
+    ("outcome", "releases", "expected"),
+    [
+        (None, False, []),
+        ({"name": "demo"}, False, [{"package": "Demo", "name": "demo"}]),
+        (
+            {"2.0": {"size": "1 KB"}, "1.0": {"size": "2 KB"}},
+            True,
+            [
+                {"package": "Demo", "version": "2.0", "size": "1 KB"},
+                {"package": "Demo", "version": "1.0", "size": "2 KB"},
+            ],
+        ),
+    ],
+)
+def test_iter_records(outcome: dict | None, releases: bool, expected: list[dict]) -> None:
+    assert list(iter_records("Demo", outcome, releases)) == expected
+
+
+def test_iter_records_error() -> None:
+    (record,) = iter_records("demo", PackageNotFoundError())
+    assert record["package"] == "demo"
+    assert "couldn't be found" in record["error"]
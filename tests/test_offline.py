@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from whatsonpypi.exceptions import PackageNotFoundError
+from whatsonpypi.offline import OfflineIndex
+from whatsonpypi.whatsonpypi import make_client
+
+
+def project(name: str, version: str) -> dict[str, Any]:
+    return {
+        "info": {"name": name, "version": version, "summary": f"{name} summary"},
+        "releases": {version: []},
+        "urls": [],
+    }
+
+
+def release(name: str, version: str) -> dict[str, Any]:
+    return {"info": {"name": name, "version": version, "summary": "old"}, "urls": []}
+
+
+def test_directory_mirror(tmp_path: Path) -> None:
+    (tmp_path / "demo-pkg" / "1.0").mkdir(parents=True)
+    (tmp_path / "demo-pkg" / "json").write_text(json.dumps(project("Demo_Pkg", "2.0")))
+    (tmp_path / "demo-pkg" / "1.0" / "json").write_text(json.dumps(release("Demo_Pkg", "1.0")))
+    (tmp_path / "flat.json").write_text(json.dumps(project("flat", "0.1")))
+
+    index = OfflineIndex(tmp_path)
+    assert json.loads(index.get("Demo_Pkg") or b"")["info"]["version"] == "2.0"
+    assert json.loads(index.get("demo-pkg", "1.0") or b"")["info"]["summary"] == "old"
+    assert index.get("flat") is not None
+    assert index.get("missing") is None
+    assert index.get("demo-pkg", "9.9") is None
+
+
+@pytest.mark.parametrize("filename", ["snapshot.jsonl", "snapshot.jsonl.gz", "snapshot.json"])
+def test_snapshot_loaded_once(tmp_path: Path, filename: str) -> None:
+    documents = [project("Demo", "2.0"), release("Demo", "1.0"), project("other", "3.0")]
+    path = tmp_path / filename
+    if ".jsonl" in filename:
+        text = "\n".join(json.dumps(d) for d in documents) + "\n"
+    else:
+        text = json.dumps(documents)
+    data = text.encode("utf-8")
+    path.write_bytes(gzip.compress(data) if filename.endswith(".gz") else data)
+
+    index = OfflineIndex(path)
+    path.unlink()  # every lookup is answered from memory
+
+    assert json.loads(index.get("demo") or b"")["info"]["version"] == "2.0"
+    assert json.loads(index.get("demo", "1.0") or b"")["info"]["summary"] == "old"
+    # the project document also answers for its latest version
+    assert json.loads(index.get("Demo", "2.0") or b"")["info"]["version"] == "2.0"
+    assert index.get("other") is not None
+    assert index.get("missing") is None
+
+
+def test_offline_client(tmp_path: Path) -> None:
+    path = tmp_path / "snapshot.jsonl"
+    path.write_text(json.dumps(project("demo", "2.0")) + "\n")
+    client = make_client(use_cache=True, offline_path=str(path))
+    assert client.cache is None
+
+    response = client.request("demo")
+    assert response.name == "demo"
+    assert response.latest_version == "2.0"
+    assert response.summary == "demo summary"
+
+    with pytest.raises(PackageNotFoundError):
+        client.request("missing")
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import time
+
+import pytest
+
+from whatsonpypi.ratelimit import RateLimiter, parse_retry_after
+
+
+def test_token_bucket_paces_requests() -> None:
+    limiter = RateLimiter(rate=50, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.release(limiter.acquire())
+    # the first token is there already; the other five take 1/50 s each
+    assert time.monotonic() - started >= 0.09
+
+
+def test_throttling_halves_concurrency_once_per_round() -> None:
+    limiter = RateLimiter(max_concurrency=8)
+    tickets = [limiter.acquire() for _ in range(8)]
+    # every request sent before the first 429 was answered is throttled too
+    for ticket in tickets:
+        limiter.release(ticket, throttled=True)
+    assert limiter.limit == 4
+    assert limiter.throttled == 8
+
+    limiter.release(limiter.acquire(), throttled=True)
+    assert limiter.limit == 1
+
+    for _ in range(10):
+        limiter.release(limiter.acquire())
+    assert 3 < limiter.limit < 8
+
+
+def test_retry_after_pauses_everyone() -> None:
+    limiter = RateLimiter()
+    limiter.release(limiter.acquire(), throttled=True, retry_after=0.1)
+    started = time.monotonic()
+    limiter.release(limiter.acquire())
+    assert time.monotonic() - started >= 0.09
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("3", 3.0), ("0.5", 0.5), ("-1", 0.0), ("", None), (None, None), ("soon", None)],
+)
+def test_parse_retry_after(value: str | None, expected: float | None) -> None:
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_date() -> None:
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 < (parse_retry_after(format_datetime(when, usegmt=True)) or 0) <= 30
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from whatsonpypi.requirements import dedupe_pins, installed_pins, parse_requirements_file
+
+
+def test_requirements_txt(tmp_path: Path) -> None:
+    (tmp_path / "base.txt").write_text("click>=8\nrequests==2.0.0  # first one wins\n")
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text(
+        "# a comment\n"
+        "-r base.txt\n"
+        "--index-url https://example.org/simple\n"
+        "-e ./local-package\n"
+        "Django==4.2.1 \\\n"
+        "    --hash=sha256:abc\n"
+        "rich[jupyter]>=13; python_version >= '3.9'\n"
+        "Requests==2.31.0\n"
+        "mypkg @ https://example.org/mypkg.tar.gz\n"
+        "./some/path\n"
+    )
+
+    assert parse_requirements_file(requirements) == [
+        ("click", None, ">=8"),
+        ("requests", "2.0.0", "=="),
+        ("Django", "4.2.1", "=="),
+        ("rich", None, ">=13"),
+        ("mypkg", None, None),
+    ]
+
+
+def test_pyproject(tmp_path: Path) -> None:
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        "[project]\n"
+        'name = "demo"\n'
+        'dependencies = ["click>=8", "requests==2.31.0"]\n'
+        "[project.optional-dependencies]\n"
+        'rich = ["rich>=13"]\n'
+        "[dependency-groups]\n"
+        'dev = ["pytest", {include-group = "lint"}]\n'
+        'lint = ["ruff==0.5.0"]\n'
+    )
+
+    assert parse_requirements_file(pyproject) == [
+        ("click", None, ">=8"),
+        ("requests", "2.31.0", "=="),
+        ("rich", None, ">=13"),
+        ("pytest", None, None),
+        ("ruff", "0.5.0", "=="),
+    ]
+
+
+def test_uv_lock(tmp_path: Path) -> None:
+    lock = tmp_path / "uv.lock"
+    lock.write_text(
+        "version = 1\n"
+        "[[package]]\n"
+        'name = "click"\n'
+        'version = "8.1.8"\n'
+        'source = { registry = "https://pypi.org/simple" }\n'
+        "[[package]]\n"
+        'name = "demo"\n'
+        'version = "0.1.0"\n'
+        'source = { editable = "." }\n'
+    )
+
+    assert parse_requirements_file(lock) == [("click", "8.1.8", "==")]
+
+
+def test_dedupe_pins() -> None:
+    pins = [("Foo.Bar", "1.0", "=="), ("foo-bar", "2.0", "=="), ("baz", None, None)]
+    assert dedupe_pins(pins) == [("Foo.Bar", "1.0", "=="), ("baz", None, None)]
+
+
+def test_installed_pins(tmp_path: Path) -> None:
+    for name, version, direct_url in [
+        ("Zeta_Pkg", "2.0", None),
+        ("alpha", "1.0", '{"url": "https://example.org/alpha.whl", "archive_info": {}}'),
+        ("local-dev", "0.1", '{"url": "file:///src", "dir_info": {"editable": true}}'),
+    ]:
+        dist_info = tmp_path / f"{name}-{version}.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text(f"Name: {name}\nVersion: {version}\n")
+        if direct_url:
+            (dist_info / "direct_url.json").write_text(direct_url)
+
+    assert installed_pins([str(tmp_path)]) == [("alpha", "1.0", "=="), ("Zeta_Pkg", "2.0", "==")]
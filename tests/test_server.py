@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+import socket
+import threading
+from typing import Any
+
+import pytest
+
+from tests.conftest import Mirror
+from whatsonpypi.exceptions import PackageNotFoundError
+from whatsonpypi.server import ServerClient, WoppServer
+from whatsonpypi.whatsonpypi import make_client, run_query
+
+
+@pytest.fixture
+def server(mirror: Mirror) -> Iterator[WoppServer]:
+    mirror.add("demo", {"version": "2.0", "summary": "Demo summary"}, {"1.0": [], "2.0": []})
+
+    server = WoppServer(("127.0.0.1", 0), make_client(offline_path=str(mirror)), max_entries=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_thin_client(server: WoppServer) -> None:
+    url = f"http://127.0.0.1:{server.server_port}"
+    client = make_client(server_url=url)
+    assert isinstance(client, ServerClient)
+
+    result = run_query("demo", None, False, False, False, None, client)
+    assert result is not None
+    assert result["current_version"] == "2.0"
+    assert result["summary"] == "Demo summary"
+    # the same lookup again comes out of the server's memory
+    cache = server.client.memory_cache
+    assert cache is not None
+    again = client.request("demo", sections={"info", "releases"})
+    assert again.summary == "Demo summary"
+    assert cache.stats()["hits"] == 1
+    assert len(cache) == 1
+
+    with pytest.raises(PackageNotFoundError):
+        client.request("missing")
+
+
+def test_lru_evicts_oldest(server: WoppServer) -> None:
+    server.lookup("demo")
+    server.lookup("demo", sections=frozenset({"info"}))
+    cache = server.client.memory_cache
+    assert cache is not None
+    assert len(cache) == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_falls_back_without_server() -> None:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = make_client(server_url=f"http://127.0.0.1:{port}")
+    assert not isinstance(client, ServerClient)
+
+
+@pytest.mark.parametrize(
+    "option", [{"index_url": "https://example.invalid/pypi"}, {"rate_limit": 5.0}]
+)
+def test_options_the_server_cannot_meet_skip_it(server: WoppServer, option: dict[str, Any]) -> None:
+    client = make_client(server_url=f"http://127.0.0.1:{server.server_port}", **option)
+    assert not isinstance(client, ServerClient)
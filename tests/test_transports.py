@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+import json
+
+import pytest
+
+from tests.conftest import Mirror
+from whatsonpypi.client import WoppClient
+from whatsonpypi.exceptions import PackageNotFoundError
+from whatsonpypi.offline import OfflineIndex
+from whatsonpypi.transports import CallableTransport, OfflineTransport, RequestsTransport
+from whatsonpypi.utils import clean_response
+from whatsonpypi.whatsonpypi import make_client
+
+INDEX_URL = "http://devpi.local:3141/root/pypi/"
+
+
+def document(name: str, version: str) -> bytes:
+    return json.dumps(
+        {"info": {"name": name, "version": version}, "releases": {version: []}, "urls": []}
+    ).encode("utf-8")
+
+
+def test_client_talks_through_transport() -> None:
+    seen: list[tuple[str, Mapping[str, str]]] = []
+
+    def handler(url: str, headers: Mapping[str, str]) -> tuple[int, bytes | None]:
+        seen.append((url, headers))
+        if url.endswith("/demo/json"):
+            return 200, document("demo", "1.0")
+        return 404, None
+
+    client = WoppClient(
+        request_hooks={"response": clean_response},
+        base_url=INDEX_URL,
+        transport=CallableTransport(handler),
+    )
+    assert client.session is None
+
+    assert client.request("demo").latest_version == "1.0"
+    assert seen[0][0] == "http://devpi.local:3141/root/pypi/demo/json"
+    assert seen[0][1]["Accept"] == "application/json"
+
+    with pytest.raises(PackageNotFoundError):
+        client.request("missing")
+
+    results = client.request_many(["demo", "missing"], max_retries=1)
+    assert isinstance(results[1], PackageNotFoundError)
+
+
+def test_default_transport_uses_requests() -> None:
+    client = WoppClient(pool_size=3)
+    assert isinstance(client.transport, RequestsTransport)
+    assert client.session is client.transport.session
+    assert client.base_url == "https://pypi.org/pypi"
+
+
+def test_offline_transport_honours_base_url(mirror: Mirror) -> None:
+    mirror.add("demo", version="1.0")
+    transport = OfflineTransport(OfflineIndex(mirror.path), INDEX_URL)
+
+    assert transport.send(INDEX_URL + "demo/1.0/json", {}, 1).status_code == 200
+    assert transport.send(INDEX_URL + "demo/json", {}, 1).status_code == 404
+    assert transport.send("https://pypi.org/pypi/demo/1.0/json", {}, 1).status_code == 404
+
+
+def test_make_client_index_url() -> None:
+    client = make_client(index_url=INDEX_URL)
+    assert client._build_url("demo", None) == "http://devpi.local:3141/root/pypi/demo/json"
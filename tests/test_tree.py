@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from click.testing import CliRunner
+
+from tests.conftest import Mirror
+from whatsonpypi.cli import main
+from whatsonpypi.client import WoppClient
+from whatsonpypi.transports import CallableTransport
+from whatsonpypi.tree import iter_requirements, resolve_tree
+from whatsonpypi.utils import clean_response
+
+INDEX = {
+    "app": ["lib-b[fast]>=1", "lib-c", 'legacy; python_version < "3"'],
+    "lib-b": ["lib-c<2", 'speedups; extra == "fast"', 'docs-tool; extra == "docs"'],
+    "lib-c": ["app"],
+    "speedups": [],
+}
+
+
+def document(name: str) -> bytes:
+    info = {"name": name, "version": "2.0", "requires_dist": INDEX[name] or None}
+    return json.dumps({"info": info, "releases": {}}).encode("utf-8")
+
+
+def make_client(calls: list[str]) -> WoppClient:
+    def handler(url: str, _headers: Any) -> tuple[int, bytes | None]:
+        name = url.split("/")[-2]
+        calls.append(name)
+        return (200, document(name)) if name in INDEX else (404, None)
+
+    return WoppClient(
+        request_hooks={"response": clean_response}, transport=CallableTransport(handler)
+    )
+
+
+def test_iter_requirements_markers_and_extras() -> None:
+    requires = INDEX["lib-b"]
+    assert [r.name for r in iter_requirements(requires, frozenset())] == ["lib-c"]
+    names = [r.name for r in iter_requirements(requires, frozenset({"fast", "docs"}))]
+    assert names == ["lib-c", "speedups", "docs-tool"]
+
+
+def test_resolve_tree_breadth_first() -> None:
+    calls: list[str] = []
+    tree = resolve_tree([("app", None), ("App", None)], make_client(calls))
+
+    # every package is looked up once, even though lib-c is reached twice and loops back
+    assert sorted(calls) == ["app", "lib-b", "lib-c", "speedups"]
+    assert tree.lookups == 4
+    assert tree.depth == 2
+    assert tree.nodes[("lib-b", frozenset({"fast"}))].depth == 1
+    assert tree.format().splitlines() == [
+        "app 2.0",
+        "├── lib-b[fast] >=1 (2.0)",
+        "│   ├── lib-c <2 (2.0, excluded)",
+        "│   │   └── app any (2.0) (*)",
+        "│   └── speedups any (2.0)",
+        "└── lib-c any (2.0) (*)",
+    ]
+
+    edges = list(tree.iter_edges())
+    assert [edge["depth"] for edge in edges] == [1, 1, 2, 2, 2]
+    assert edges[2] == {
+        "package": "lib-b[fast]",
+        "version": "2.0",
+        "depth": 2,
+        "dependency": "lib-c",
+        "requirement": "<2",
+        "marker": "",
+        "latest": "2.0",
+        "satisfied": False,
+    }
+
+
+def test_resolve_tree_max_depth() -> None:
+    calls: list[str] = []
+    tree = resolve_tree([("app", None)], make_client(calls), max_depth=0)
+    assert calls == ["app"]
+    assert tree.format() == "app 2.0"
+
+
+def test_cli_tree(mirror: Mirror) -> None:
+    for name, requires_dist in INDEX.items():
+        mirror.add(name, {"version": "2.0", "requires_dist": requires_dist or None})
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["app", "missing", "--tree", "--offline", str(mirror)])
+    assert result.exit_code == 1
+    assert result.stdout.splitlines()[0] == "app 2.0"
+    assert "missing (not found)" in result.stdout
+    assert "5 packages, depth 2, 5 lookups" in result.stderr
+    assert "1 of 2 packages could not be fetched." in result.stderr
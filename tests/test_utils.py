@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import io
+import json
+from typing import Any
+
+import pytest
+
+from whatsonpypi.utils import (
+    ReleaseRecord,
+    clean_response,
+    iter_project_sections,
+    parse_pkg_string,
+    release_file_info,
+)
+
+DOCUMENT: dict[str, Any] = {
+    "info": {
+        "name": "demo",
+        "version": "1.1.0",
+        "summary": "A demo package",
+        "project_urls": {"Homepage": "https://example.org"},
+        "requires_dist": ["requests>=2"],
+    },
+    "last_serial": 1,
+    "releases": {
+        "1.0.0": [
+            {
+                "filename": "demo-1.0.0.tar.gz",
+                "packagetype": "sdist",
+                "size": 2048,
+                "upload_time_iso_8601": "2024-01-01T00:00:00.000000Z",
+                "digests": {"md5": "a", "sha256": "b"},
+            },
+            {
+                "filename": "demo-1.0.0-py3-none-any.whl",
+                "packagetype": "bdist_wheel",
+                "size": 1024,
+                "upload_time_iso_8601": "2024-01-01T00:00:00.000000Z",
+                "digests": {"md5": "c", "sha256": "d"},
+            },
+        ],
+        "1.0.1rc1": [],
+        "1.1.0": [
+            {
+                "filename": "demo-1.1.0.tar.gz",
+                "packagetype": "sdist",
+                "size": 4096,
+                "upload_time_iso_8601": "2024-02-01T00:00:00.000000Z",
+                "digests": {"md5": "e", "sha256": "f"},
+            }
+        ],
+    },
+    "urls": [
+        {
+            "filename": "demo-1.1.0.tar.gz",
+            "packagetype": "sdist",
+            "size": 4096,
+            "upload_time_iso_8601": "2024-02-01T00:00:00.000000Z",
+            "digests": {"md5": "e", "sha256": "f"},
+        }
+    ],
+    "vulnerabilities": [],
+}
+
+
+class FakeResponse:
+    """Quacks like a requests.Response, either already read or still streaming."""
+
+    def __init__(self, document: dict[str, Any], streaming: bool) -> None:
+        self.status_code = 200
+        self._body = json.dumps(document).encode("utf-8")
+        self._content_consumed = not streaming
+        self.raw = io.BytesIO(self._body) if streaming else None
+
+    def json(self) -> Any:
+        return json.loads(self._body)
+
+
+def test_clean_response() -> None:
+    cleaned = clean_response(FakeResponse(DOCUMENT, streaming=False)).cleaned_json
+    assert cleaned["name"] == "demo"
+    assert cleaned["latest_version"] == "1.1.0"
+    assert cleaned["dependencies"] == ["requests>=2"]
+    assert cleaned["releases"] == ["1.0.0", "1.0.1rc1", "1.1.0"]
+    # wheels win over other artifacts, releases without files are left out
+    assert cleaned["release_files"]["1.0.0"][0] == "demo-1.0.0-py3-none-any.whl"
+    assert "1.0.1rc1" not in cleaned["release_files"]
+    assert cleaned["latest_pkg_urls"]["md5"] == "e"
+
+
+def test_streaming_matches_full_parse() -> None:
+    pytest.importorskip("ijson")
+    full = clean_response(FakeResponse(DOCUMENT, streaming=False)).cleaned_json
+    streamed = clean_response(FakeResponse(DOCUMENT, streaming=True)).cleaned_json
+    assert streamed == full
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_clean_response_projection(streaming: bool) -> None:
+    if streaming:
+        pytest.importorskip("ijson")
+    cleaned = clean_response(
+        FakeResponse(DOCUMENT, streaming=streaming), sections={"info"}
+    ).cleaned_json
+    assert cleaned["project_urls"] == {"Homepage": "https://example.org"}
+    assert "releases" not in cleaned
+    assert "latest_pkg_urls" not in cleaned
+
+    cleaned = clean_response(
+        FakeResponse(DOCUMENT, streaming=streaming), sections={"info", "releases"}
+    ).cleaned_json
+    assert cleaned["releases"] == ["1.0.0", "1.0.1rc1", "1.1.0"]
+    assert "latest_pkg_urls" not in cleaned
+
+
+class TrickleStream:
+    """Hands out a few bytes per read, so we can tell how much of the body was parsed."""
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.body[self.position : self.position + (8 if size < 0 else min(size, 8))]
+        self.position += len(chunk)
+        return chunk
+
+
+def test_streaming_stops_after_wanted_sections() -> None:
+    pytest.importorskip("ijson")
+    body = json.dumps(DOCUMENT).encode("utf-8")
+    stream = TrickleStream(body)
+    sections = list(iter_project_sections(stream, {"info"}))
+    assert [section for section, _ in sections] == ["info"]
+    assert stream.position < len(body) // 2
+
+
+def test_release_record_round_trip() -> None:
+    pkg = DOCUMENT["releases"]["1.0.0"][1]
+    record = ReleaseRecord.from_row("1.0.0", ReleaseRecord.to_row(pkg))
+    assert record.version == "1.0.0"
+    assert record.size == 1024
+    assert record.upload_time is not None and record.upload_time.year == 2024
+    assert record.to_dict()["size"] == "1.00 KB"
+    assert record.to_dict()["md5"] == "c"
+    # the upload time is shown as PyPI wrote it, as for the latest release
+    assert record.to_dict()["upload_time"] == "2024-01-01T00:00:00.000000Z"
+    assert record.to_dict()["upload_time"] == release_file_info(pkg)["upload_time"]
+    assert not hasattr(record, "__dict__")
+
+
+@pytest.mark.parametrize(
+    ("in_str", "expected"),
+    [
+        ("requests", ("requests", None, None)),
+        (" requests==2.31.0 ", ("requests", "2.31.0", "==")),
+        ("django>=4.2,<5", ("django", None, "<5,>=4.2")),
+        ("django==4.*", ("django", None, "==4.*")),
+        ("not a requirement!", ("not a requirement!", None, None)),
+    ],
+)
+def test_parse_pkg_string(in_str: str, expected: tuple[str, str | None, str | None]) -> None:
+    assert parse_pkg_string(in_str) == expected
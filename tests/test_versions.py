@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+import pytest
+
+from whatsonpypi.versions import VersionIndex
+
+RELEASES = ["1.0", "1.10", "1.2", "2.0a1", "2.0", "2.0.1", "2.1rc1", "3.0.dev1", "bogus"]
+
+
+@pytest.fixture
+def index() -> VersionIndex:
+    return VersionIndex(RELEASES, yanked={"2.0.1"})
+
+
+def test_orders_by_pep440(index: VersionIndex) -> None:
+    assert index.releases == ["1.0", "1.2", "1.10", "2.0a1", "2.0", "2.0.1", "2.1rc1", "3.0.dev1"]
+    assert index.invalid == ["bogus"]
+    assert len(index) == 8
+
+
+@pytest.mark.parametrize(
+    ("specifier", "prereleases", "expected"),
+    [
+        ("", None, ["2.0.1", "2.0", "1.10", "1.2", "1.0"]),
+        (">=1.2,<2", None, ["1.10", "1.2"]),
+        (">1.2,<=2.0", None, ["2.0", "1.10"]),
+        ("==2.*", None, ["2.0.1", "2.0"]),
+        ("==2.*", True, ["2.1rc1", "2.0.1", "2.0", "2.0a1"]),
+        ("~=1.2", None, ["1.10", "1.2"]),
+        ("!=2.0", None, ["2.0.1", "1.10", "1.2", "1.0"]),
+        ("==1.2", None, ["1.2"]),
+        (">=2.1rc1", None, ["3.0.dev1", "2.1rc1"]),
+        (">5", None, []),
+    ],
+)
+def test_filter(
+    index: VersionIndex, specifier: str, prereleases: bool | None, expected: list[str]
+) -> None:
+    assert index.filter(specifier, prereleases=prereleases) == expected
+
+
+def test_filter_without_yanked(index: VersionIndex) -> None:
+    assert index.filter("==2.*", include_yanked=False) == ["2.0"]
+
+
+def test_latest(index: VersionIndex) -> None:
+    assert index.latest() == "2.0"  # 2.0.1 is yanked
+    assert index.latest(include_yanked=True) == "2.0.1"
+    assert index.latest(prereleases=True) == "3.0.dev1"
+    assert index.latest("==1.*") == "1.10"
+    assert index.latest(">=4") is None
+
+
+@pytest.mark.parametrize("specifier", ["==1.0", "<=1.0", "==1.0+local", ">=1.0,<=1.0", "<1.1"])
+def test_filter_local_versions(specifier: str) -> None:
+    releases = ["0.9", "1.0", "1.0+local", "1.0.0+other", "1.0.post1", "1.1"]
+    expected = sorted(SpecifierSet(specifier).filter(releases), key=Version, reverse=True)
+    assert VersionIndex(releases).filter(specifier) == expected
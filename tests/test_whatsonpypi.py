@@ -2,7 +2,16 @@ from __future__ import annotations
 
 import pytest
 
-from whatsonpypi.whatsonpypi import run_query
+from tests.conftest import Mirror
+from whatsonpypi.exceptions import WoppError
+from whatsonpypi.whatsonpypi import (
+    diff_versions,
+    get_sections,
+    get_version_status,
+    make_client,
+    run_queries,
+    run_query,
+)
 
 
 @pytest.mark.parametrize("pkg", ["requests", "httpx", "rich"])
@@ -48,3 +57,93 @@ def test_run_query_typical_with_more() -> None:
     assert result is not None
     assert isinstance(result["dependencies"], str)
     assert "yanked" in str(result["current_package_info"]).lower()
+
+
+def test_run_queries_preserves_input_order() -> None:
+    results = run_queries(
+        [
+            ("rich", None, None),
+            ("this-package-does-not-exist-1234", None, None),
+            ("requests", None, None),
+        ],
+        more_out=False,
+        launch_docs=False,
+        open_page=False,
+    )
+    assert len(results) == 3
+    assert isinstance(results[0], dict) and results[0]["name"] == "rich"
+    assert isinstance(results[1], WoppError)
+    assert isinstance(results[2], dict) and results[2]["name"] == "requests"
+
+
+def test_run_query_with_specifier() -> None:
+    result = run_query(
+        "django",
+        version=None,
+        more_out=False,
+        launch_docs=False,
+        open_page=False,
+        specifier=">=4.2,<4.2.3",
+    )
+    assert result is not None
+    assert list(result) == ["4.2.2", "4.2.1", "4.2"]
+
+
+@pytest.mark.parametrize(
+    ("version", "specifier", "latest", "expected"),
+    [
+        ("1.0", "==", "2.0", "outdated"),
+        ("2.0", "==", "2.0", "up to date"),
+        (None, ">=1,<2", "2.0", "latest excluded"),
+        (None, ">=1", "2.0", "latest allowed"),
+        (None, None, "2.0", "unpinned"),
+        ("not-a-version", "==", "2.0", "unknown"),
+    ],
+)
+def test_get_version_status(
+    version: str | None, specifier: str | None, latest: str, expected: str
+) -> None:
+    assert get_version_status(version, specifier, latest) == expected
+
+
+def test_get_sections() -> None:
+    assert get_sections(more_out=False, launch_docs=True, open_page=False) == {"info"}
+    assert get_sections(more_out=True, launch_docs=False, open_page=True) == {"info"}
+    assert get_sections(more_out=True, launch_docs=False, open_page=False) is None
+    assert get_sections(more_out=False, launch_docs=False, open_page=False) == {
+        "info",
+        "releases",
+    }
+
+
+def test_diff_versions(mirror: Mirror) -> None:
+    releases = {
+        "1.0": (">=3.8", "MIT", ["idna>=2", 'colorama; sys_platform == "win32"'], [100, 50]),
+        "2.0": (">=3.9", "MIT", ["idna>=3", "certifi"], [150]),
+    }
+    for version, (requires_python, license_, requires_dist, sizes) in releases.items():
+        files = [
+            {"filename": f"demo-{version}-py3-none-any.whl", "size": sizes[0]},
+            *({"filename": f"demo-{version}.tar.gz", "size": size} for size in sizes[1:]),
+        ]
+        info = {
+            "requires_python": requires_python,
+            "license": license_,
+            "requires_dist": requires_dist,
+        }
+        mirror.add("demo", info, urls=files, version=version)
+
+    rows = diff_versions("Demo", "1.0", "2.0", make_client(offline_path=str(mirror)))
+    assert [(row["field"], row["change"]) for row in rows] == [
+        ("requires_python", "changed"),
+        ("dependency certifi", "added"),
+        ('dependency colorama; sys_platform == "win32"', "removed"),
+        ("dependency idna", "changed"),
+        ("size sdist", "removed"),
+        ("size wheel py3-none-any", "+50.0%"),
+    ]
+    assert rows[0]["old"] == ">=3.8"
+    assert rows[3]["new"] == "idna>=3"
+
+    with pytest.raises(WoppError):
+        diff_versions("demo", "1.0", "3.0", make_client(offline_path=str(mirror)))
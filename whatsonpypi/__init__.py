@@ -1,4 +1,15 @@
-from ._version import __version__
+from typing import Any
+
 from .cli import main
 
 __all__ = ["__version__", "main"]
+
+
+def __getattr__(name: str) -> Any:
+    # looking up the installed version needs importlib.metadata, which is slow to import,
+    # so it is only done when asked for
+    if name == "__version__":
+        from ._version import __version__
+
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,164 @@
+"""
+Release artifacts: listing them, and checking local files against their published digests.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+import hashlib
+import mmap
+import os
+from pathlib import Path
+from typing import Any
+
+from packaging.utils import (
+    InvalidSdistFilename,
+    InvalidWheelFilename,
+    parse_sdist_filename,
+    parse_wheel_filename,
+)
+
+from .client import WoppClient, WoppResponse
+from .constants import DEFAULT_HASH_CHUNK_SIZE
+from .exceptions import WoppError
+from .utils import get_human_size
+
+# digests published by PyPI, strongest first
+DIGESTS: tuple[str, ...] = ("sha256", "blake2b_256", "md5")
+# the sections a response needs for its files
+FILE_SECTIONS: frozenset[str] = frozenset({"info", "urls"})
+
+
+def _new_hash(algorithm: str) -> Any:
+    if algorithm == "blake2b_256":
+        return hashlib.blake2b(digest_size=32)
+    if algorithm == "md5":
+        return hashlib.md5(usedforsecurity=False)
+    return hashlib.new(algorithm)
+
+
+def hash_file(
+    path: str | Path,
+    algorithms: Iterable[str] = DIGESTS[:2],
+    chunk_size: int = DEFAULT_HASH_CHUNK_SIZE,
+) -> dict[str, str]:
+    """
+    Hashes a file with several algorithms in one pass.
+
+    The file is memory-mapped and fed to the hashes in chunks, so that it is
+    read once and never copied whole into memory.
+
+    :param path: file to hash
+    :param algorithms: names from `DIGESTS`, or any `hashlib` algorithm
+    :param chunk_size: bytes handed to the hashes at a time
+    :return: hex digest for each algorithm
+    """
+    hashes = {algorithm: _new_hash(algorithm) for algorithm in algorithms}
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        # empty files can't be mapped, and have nothing to hash
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, chunk_size):
+                        chunk = view[offset : offset + chunk_size]
+                        for hash_ in hashes.values():
+                            hash_.update(chunk)
+                        chunk.release()
+                finally:
+                    view.release()
+    return {algorithm: hash_.hexdigest() for algorithm, hash_ in hashes.items()}
+
+
+def parse_artifact_filename(path: str | Path) -> tuple[str, str] | None:
+    """
+    Returns the (name, version) a wheel or sdist filename is for, or None if it isn't one.
+    """
+    filename = Path(path).name
+    try:
+        if filename.endswith(".whl"):
+            name, version, *_ = parse_wheel_filename(filename)
+        else:
+            name, version = parse_sdist_filename(filename)
+    except (InvalidWheelFilename, InvalidSdistFilename):
+        return None
+    return name, str(version)
+
+
+def artifact_key(filename: str) -> str:
+    """
+    Returns what an artifact is for, without its version, so that the same artifact
+    of two releases can be paired up: e.g. "wheel py3-none-any" or "sdist".
+    """
+    try:
+        if filename.endswith(".whl"):
+            parse_wheel_filename(filename)
+            # the compatibility tags, as written
+            return f"wheel {'-'.join(filename[: -len('.whl')].split('-')[-3:])}"
+        parse_sdist_filename(filename)
+    except (InvalidWheelFilename, InvalidSdistFilename):
+        return filename
+    return "sdist"
+
+
+def file_rows(response: WoppResponse) -> list[dict[str, Any]]:
+    """
+    Returns a row for each artifact of a release, for display.
+    """
+    return [
+        {
+            "filename": file["filename"],
+            "type": file["packagetype"],
+            "python": file["python_version"],
+            "size": get_human_size(float(file["size"])),
+            "sha256": file["sha256"],
+            "yanked": (file["yanked_reason"] or "yes") if file["yanked"] else "",
+        }
+        for file in response.files
+    ]
+
+
+def iter_package_files(
+    packages: Sequence[tuple[str, str | None]],
+    client: WoppClient,
+) -> Iterator[tuple[int, WoppResponse | WoppError]]:
+    """
+    Looks up the artifacts of several releases concurrently.
+
+    :param packages: (name, version) of each release; None for the latest one
+    :param client: client to query with, see `make_client`
+    :return: (input position, response or the error raised), in completion order
+    """
+    return client.iter_many(
+        [(name.lower(), version) for name, version in packages], sections=FILE_SECTIONS
+    )
+
+
+def verify_file(path: str | Path, response: WoppResponse) -> dict[str, Any]:
+    """
+    Checks a local artifact against the digests the index publishes for its release.
+
+    The artifact of the same name is compared, or any artifact of the release
+    if none has that name.
+
+    :param path: local file
+    :param response: response for the release, with its files
+    :return: row with the digests compared and whether they matched
+    """
+    filename = Path(path).name
+    candidates = [f for f in response.files if f["filename"] == filename] or response.files
+    algorithms = [a for a in DIGESTS if any(f.get(a) for f in candidates)][:2]
+    local = hash_file(path, algorithms)
+
+    match = next(
+        (f for f in candidates if all(f.get(a) == local[a] for a in algorithms if f.get(a))),
+        None,
+    )
+    return {
+        "file": filename,
+        "release": f"{response.name} {response.latest_version}",
+        "matches": match["filename"] if match else "",
+        **{algorithm: local[algorithm] for algorithm in algorithms},
+        "status": "ok" if match and algorithms else "mismatch",
+    }
@@ -0,0 +1,186 @@
+"""
+Asynchronous API client for querying PyPI JSON endpoints.
+
+Requires the optional `httpx` dependency: `pip install whatsonpypi[async]`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Collection, Iterable
+from types import TracebackType
+from typing import Any
+
+from requests.hooks import dispatch_hook
+
+try:
+    import httpx
+
+    _HAS_HTTPX: bool = True
+except ImportError:
+    _HAS_HTTPX = False
+
+from .client import BaseWoppClient, PackageSpec, WoppResponse
+from .constants import DEFAULT_MAX_WORKERS
+from .exceptions import (
+    MissingDependencyError,
+    PackageNotFoundError,
+    PackageNotProvidedError,
+    WoppError,
+)
+from .utils import BODY_ERRORS
+
+_INSTALL_HINT: str = "AsyncWoppClient needs httpx: pip install whatsonpypi[async]"
+
+# Same policy the synchronous client hands to urllib3's Retry.
+RETRY_STATUSES: frozenset[int] = frozenset({500, 502, 503, 504})
+BACKOFF_FACTOR: float = 0.1
+
+
+def _backoff(attempt: int) -> float:
+    """
+    Seconds to wait before retry number `attempt`, mirroring urllib3's exponential backoff.
+    """
+    if attempt <= 1:
+        return 0.0
+    return float(BACKOFF_FACTOR * (2 ** (attempt - 1)))
+
+
+class AsyncWoppClient(BaseWoppClient):
+    """
+    Asynchronous client for accessing the PyPI JSON API.
+
+    Keeps one pool of keep-alive connections for its lifetime and bounds the number of
+    requests in flight. Use it as an async context manager, or call `aclose()` when done.
+    """
+
+    def __init__(
+        self,
+        request_hooks: dict[str, Any] | None = None,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        base_url: str | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """
+        :param request_hooks: requests hooks to run on each response
+        :param max_concurrency: Upper bound on requests in flight
+        :param base_url: URL of the JSON API of the package index; defaults to PyPI
+        :param transport: httpx transport to send the requests through, e.g.
+            `httpx.MockTransport` for an in-process stand-in
+        """
+        if not _HAS_HTTPX:
+            raise MissingDependencyError(_INSTALL_HINT)
+        super().__init__(request_hooks, base_url)
+        self.max_concurrency: int = max(1, max_concurrency)
+        self.client: httpx.AsyncClient = httpx.AsyncClient(
+            headers=self.headers,
+            follow_redirects=True,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        # created lazily so that it binds to the running event loop
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def __aenter__(self) -> AsyncWoppClient:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Closes the underlying connection pool.
+        """
+        await self.client.aclose()
+
+    async def request(
+        self,
+        package: str | None = None,
+        version: str | None = None,
+        timeout: float = 3.1,
+        max_retries: int = 3,
+        sections: Collection[str] | None = None,
+    ) -> WoppResponse:
+        """
+        Sends a GET request to the PyPI API and returns a structured WoppResponse.
+
+        :param package: The package name to query
+        :param version: Optional version string
+        :param timeout: Request timeout in seconds
+        :param max_retries: Retry attempts for failed requests
+        :param sections: Top-level sections of the document the response hooks should keep,
+            e.g. only "info" when the releases aren't needed. Defaults to all of them.
+        :return: WoppResponse object with parsed data
+        :raises PackageNotProvidedError: if package is None
+        :raises PackageNotFoundError: if the PyPI API returns 404 or 5xx status codes
+        """
+        if package is None:
+            raise PackageNotProvidedError
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        url = self._build_url(package, version)
+        async with self._semaphore:
+            response = await self._send(url, timeout, max_retries)
+
+        if response.status_code == 404 or response.status_code >= 500:
+            raise PackageNotFoundError  # Treat all 5xx as failure to find package
+
+        try:
+            response = dispatch_hook("response", self.request_hooks, response, sections=sections)
+        except BODY_ERRORS as e:
+            raise PackageNotFoundError from e
+        return WoppResponse(response.status_code, getattr(response, "cleaned_json", None))
+
+    async def request_many(
+        self,
+        packages: Iterable[PackageSpec],
+        timeout: float = 3.1,
+        max_retries: int = 3,
+        sections: Collection[str] | None = None,
+    ) -> list[WoppResponse | WoppError]:
+        """
+        Fetches several packages concurrently, bounded by `max_concurrency`.
+
+        :param packages: Package names, or (package, version) tuples
+        :param timeout: Request timeout in seconds, per package
+        :param max_retries: Retry attempts for failed requests, per package
+        :param sections: Top-level sections of the documents the response hooks should keep
+        :return: List of WoppResponse or WoppError objects, one per input package
+        """
+        specs = [(spec, None) if isinstance(spec, str) else spec for spec in packages]
+
+        async def _fetch(spec: tuple[str, str | None]) -> WoppResponse | WoppError:
+            try:
+                return await self.request(spec[0], spec[1], timeout, max_retries, sections)
+            except WoppError as e:
+                return e
+
+        return list(await asyncio.gather(*(_fetch(spec) for spec in specs)))
+
+    async def _send(self, url: str, timeout: float, max_retries: int) -> httpx.Response:
+        """
+        Performs the GET request, retrying connection errors and 5xx responses.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.get(url, timeout=timeout)
+            except httpx.HTTPError as e:
+                if attempt >= max_retries:
+                    raise PackageNotFoundError from e
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                    return response
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(_backoff(attempt))
@@ -0,0 +1,309 @@
+"""
+Caches of cleaned PyPI JSON responses: persistent on disk, or in memory.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import contextlib
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from .constants import DEFAULT_CACHE_MAX_SIZE, DEFAULT_CACHE_TTL, DEFAULT_MEMORY_CACHE_SIZE
+
+if TYPE_CHECKING:
+    from .client import WoppResponse
+
+# Bump whenever the shape of the cleaned response changes, so that entries
+# written by older versions are treated as misses instead of being misread.
+SCHEMA_VERSION: int = 4
+
+
+def default_cache_dir() -> Path:
+    """
+    Returns the directory used when none is given.
+
+    Honours `WOPP_CACHE_DIR`, then the platform's user cache location.
+    """
+    override = os.environ.get("WOPP_CACHE_DIR")
+    if override:
+        return Path(override)
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or str(Path.home() / "AppData" / "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "whatsonpypi"
+
+
+class CacheEntry:
+    """
+    A cleaned response document along with the validators of the response it came from.
+    """
+
+    def __init__(
+        self,
+        data: dict[str, Any],
+        etag: str | None = None,
+        last_modified: str | None = None,
+        stored_at: float | None = None,
+    ) -> None:
+        self.data: dict[str, Any] = data
+        self.etag: str | None = etag
+        self.last_modified: str | None = last_modified
+        self.stored_at: float = time.time() if stored_at is None else stored_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    @property
+    def validators(self) -> dict[str, str]:
+        """
+        Conditional request headers to revalidate this entry with.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class DiskCache:
+    """
+    Size-bounded LRU cache of cleaned response documents, one compact JSON file per URL.
+
+    Only the output of the `clean_response` hook is stored, so a hit skips both the
+    download and the cleanup pass. Entries younger than `ttl` seconds are served
+    without touching the network. Older entries are revalidated with a conditional
+    request, and a 304 reuses the stored document. When the cache grows past
+    `max_size` bytes, the least recently used entries are evicted.
+
+    The size of the cache is counted once, then kept up to date as entries are
+    written, so that a write only scans the directory when something must be evicted.
+    """
+
+    suffix: str = ".json"
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+    ) -> None:
+        self.directory: Path = Path(directory) if directory else default_cache_dir()
+        self.ttl: float = ttl
+        self.max_size: int = max_size
+        # bytes on disk, counted on the first write
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{self.suffix}"
+
+    def get(self, key: str) -> CacheEntry | None:
+        """
+        Returns the entry stored for `key`, or None if there is none.
+        """
+        path = self._path(key)
+        try:
+            stored: dict[str, Any] = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        data = stored.get("data")
+        if (
+            stored.get("schema") != SCHEMA_VERSION
+            or stored.get("key") != key
+            or not isinstance(data, dict)
+        ):
+            return None
+
+        # mark as recently used
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return CacheEntry(
+            data, stored.get("etag"), stored.get("last_modified"), stored.get("stored_at")
+        )
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """
+        Stores `entry` under `key`, evicting old entries if the cache is over its size limit.
+        """
+        stored = {
+            "schema": SCHEMA_VERSION,
+            "key": key,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "stored_at": entry.stored_at,
+            "data": entry.data,
+        }
+        body = json.dumps(stored, separators=(",", ":")).encode("utf-8")
+        path = self._path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                if self._size is None:
+                    self._size = sum(size for _, size, _ in self._scan())
+            try:
+                replaced = path.stat().st_size
+            except OSError:
+                replaced = 0
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError:
+            # caching is best effort
+            return
+        with self._lock:
+            self._size += len(body) - replaced
+            over = self._size > self.max_size
+        if over:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes least recently used entries until the cache fits in `max_size`.
+        """
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda f: f[0]):
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._size = total
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        """
+        Returns (last used, size, path) of every entry.
+        """
+        files = []
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+        for path in self.directory.glob(f"*{self.suffix}"):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+        with self._lock:
+            self._size = None
+
+
+class MemoryCache:
+    """
+    Bounded in-process LRU cache of `WoppResponse` objects, for long-running applications.
+
+    Hits return the stored response itself, shared by every caller, so they cost
+    neither a download nor a cleanup pass, and anything memoised on the response
+    (sorted releases, the version index) is reused too. Treat cached responses as
+    read-only. Entries older than `ttl` seconds are dropped when next asked for.
+    It is safe to use from several threads.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MEMORY_CACHE_SIZE,
+        max_bytes: int | None = None,
+        ttl: float = DEFAULT_CACHE_TTL,
+    ) -> None:
+        """
+        :param max_entries: responses to keep at most
+        :param max_bytes: total size of the responses to keep at most, counted as compact
+            JSON; unlimited if None
+        :param ttl: seconds a response is kept for
+        """
+        self.max_entries: int = max_entries
+        self.max_bytes: int | None = max_bytes
+        self.ttl: float = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.size: int = 0
+        # key -> (stored at, size, response), least recently used first
+        self._entries: OrderedDict[str, tuple[float, int, WoppResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> WoppResponse | None:
+        """
+        Returns the response stored for `key`, or None if there is none or it expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: str, response: WoppResponse) -> None:
+        """
+        Stores `response` under `key`, evicting the least recently used entries to make room.
+        """
+        size = len(response.encoded()) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic(), size, response)
+            self.size += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.size > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, prefix: str | None = None) -> int:
+        """
+        Drops entries whose key starts with `prefix`, or every entry.
+
+        :return: number of entries dropped
+        """
+        with self._lock:
+            keys = [key for key in self._entries if prefix is None or key.startswith(prefix)]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the counters and current size of the cache.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _drop(self, key: str) -> None:
+        self.size -= self._entries.pop(key)[1]
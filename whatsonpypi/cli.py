@@ -1,15 +1,37 @@
 from __future__ import annotations
 
+import sys
+from typing import Any
+
 import click
 
-from . import __version__
-from .utils import parse_pkg_string, pretty
-from .whatsonpypi import run_query
+from .constants import DEFAULT_CACHE_TTL, DEFAULT_SERVER_URL
+from .formats import OUTPUT_FORMATS
+
+
+def print_version(ctx: click.Context, _param: click.Parameter, value: bool) -> None:
+    """
+    Prints the version like `click.version_option`, but only looks it up when asked for.
+    """
+    if not value or ctx.resilient_parsing:
+        return
+    from ._version import __version__
+
+    click.echo(f"{ctx.find_root().info_name}, version {__version__}")
+    ctx.exit()
 
 
 @click.command(context_settings={"help_option_names": ["-h", "--help"]})
-@click.version_option(__version__, "-v", "--version")
-@click.argument("package")
+@click.option(
+    "-v",
+    "--version",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=print_version,
+    help="Show the version and exit.",
+)
+@click.argument("packages", nargs=-1, required=False)
 @click.option(
     "-m",
     "--more",
@@ -45,12 +67,186 @@ from .whatsonpypi import run_query
     help="Show release history. Use positive number for most"
     " recent, negative for oldest. E.g. '--history -10' or '--history 10'",
 )
+@click.option(
+    "--pre",
+    "prereleases",
+    is_flag=True,
+    required=False,
+    default=False,
+    help="Flag to include pre-releases when filtering releases by a version range",
+)
+@click.option(
+    "-r",
+    "--requirements",
+    "requirement_files",
+    multiple=True,
+    required=False,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Report current vs latest version for every package in a requirements file,"
+    " pyproject.toml or uv.lock. Can be repeated.",
+)
+@click.option(
+    "--index-url",
+    required=False,
+    default=None,
+    envvar="WOPP_INDEX_URL",
+    help="URL of the JSON API of the package index to query, e.g. a local devpi"
+    " or warehouse instance. Defaults to https://pypi.org/pypi.",
+)
+@click.option(
+    "--offline",
+    "offline_path",
+    required=False,
+    default=None,
+    type=click.Path(exists=True),
+    envvar="WOPP_OFFLINE",
+    help="Answer every lookup from a local PyPI mirror directory or snapshot file"
+    " instead of the network.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    required=False,
+    default=False,
+    help="Flag to skip the on-disk response cache",
+)
+@click.option(
+    "--refresh",
+    is_flag=True,
+    required=False,
+    default=False,
+    help="Flag to revalidate cached responses with PyPI before using them",
+)
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    required=False,
+    default=None,
+    type=click.Choice(OUTPUT_FORMATS),
+    help="Write machine-readable records instead of tables, one per line as results"
+    " come in: a JSON array, newline-delimited JSON or CSV.",
+)
+@click.option(
+    "--timings",
+    "timings_format",
+    required=False,
+    default=None,
+    is_flag=False,
+    flag_value="text",
+    type=click.Choice(["text", "json"]),
+    help="Report where the time went (per request stages, bytes, retries, cache hits"
+    " and rendering) on stderr, as text or JSON.",
+)
+@click.option(
+    "--cache-ttl",
+    required=False,
+    default=DEFAULT_CACHE_TTL,
+    show_default=True,
+    type=float,
+    envvar="WOPP_CACHE_TTL",
+    help="Seconds a cached response is used before it is revalidated with PyPI",
+)
+@click.option(
+    "--diff",
+    nargs=2,
+    required=False,
+    default=None,
+    metavar="OLD NEW",
+    help="Show what changed between two versions of the package: requires_python,"
+    " dependencies, license and artifact sizes. Only those two releases are fetched.",
+)
+@click.option(
+    "--files",
+    is_flag=True,
+    required=False,
+    default=False,
+    help="Flag to list every artifact of the release, with its size, digests and" " yanked status",
+)
+@click.option(
+    "--verify",
+    "verify_paths",
+    multiple=True,
+    required=False,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Check a local wheel or sdist against the digests published on the index."
+    " The release is read from the filename, or from the package argument if the filename"
+    " doesn't tell. Can be repeated.",
+)
+@click.option(
+    "--outdated",
+    is_flag=True,
+    required=False,
+    default=False,
+    help="Flag to list the installed packages that have a newer release on the index."
+    " Packages given as arguments narrow the list.",
+)
+@click.option(
+    "--tree",
+    is_flag=True,
+    required=False,
+    default=False,
+    help="Flag to show the tree of dependencies, at their latest versions. Each level"
+    " is looked up concurrently.",
+)
+@click.option(
+    "--depth",
+    required=False,
+    default=None,
+    type=click.IntRange(min=0),
+    help="Levels of dependencies to expand with --tree. Defaults to all of them.",
+)
+@click.option(
+    "--rate-limit",
+    required=False,
+    default=None,
+    type=click.FloatRange(min=0, min_open=True),
+    envvar="WOPP_RATE_LIMIT",
+    help="Most requests per second to send to the index. Whatever the limit, requests"
+    " slow down and retry when the index answers 429.",
+)
+@click.option(
+    "--serve",
+    is_flag=True,
+    required=False,
+    default=False,
+    help="Flag to run a local server that keeps connections and responses warm for"
+    " other wopp calls, on the --server URL. Runs until interrupted.",
+)
+@click.option(
+    "--server",
+    "server_url",
+    required=False,
+    default=None,
+    envvar="WOPP_SERVER",
+    help=f"URL of a server started with --serve, to send lookups through. Lookups are"
+    f" made directly if it isn't running, or with --offline, --index-url, --rate-limit,"
+    f" --no-cache or --refresh. Defaults to {DEFAULT_SERVER_URL} with --serve.",
+)
 def main(
-    package: str,
+    packages: tuple[str, ...],
     more: bool,
     docs: bool,
     page: bool,
     history: int | None,
+    prereleases: bool,
+    requirement_files: tuple[str, ...],
+    index_url: str | None,
+    offline_path: str | None,
+    no_cache: bool,
+    refresh: bool,
+    output_format: str | None,
+    timings_format: str | None,
+    cache_ttl: float,
+    diff: tuple[str, str] | None,
+    files: bool,
+    verify_paths: tuple[str, ...],
+    outdated: bool,
+    tree: bool,
+    depth: int | None,
+    rate_limit: float | None,
+    serve: bool,
+    server_url: str | None,
 ) -> None:
     """
     A CLI tool to get package info from PyPI.
@@ -62,24 +258,267 @@ def main(
     OR
 
     $ wopp django
+
+    OR, for several packages at once,
+
+    $ wopp django requests==2.31.0 rich
+
+    OR, for the releases in a version range,
+
+    $ wopp "django>=4.2,<5"
+
+    OR, to check everything in a requirements file,
+
+    $ wopp -r requirements.txt
+
+    OR, for what changed between two versions,
+
+    $ wopp django --diff 4.2 5.0
+
+    OR, to check a wheel against the digests on PyPI,
+
+    $ wopp --verify dist/whatsonpypi-0.4.3-py3-none-any.whl
+
+    OR, for the installed packages that are out of date,
+
+    $ wopp --outdated
+
+    OR, for the tree of dependencies,
+
+    $ wopp "requests[socks]" --tree
+
+    OR, to keep a warm server around for scripts that call wopp a lot,
+
+    $ wopp --serve & export WOPP_SERVER=http://127.0.0.1:7790
     """
+    if serve:
+        from .server import serve as serve_forever
+        from .whatsonpypi import make_client
+
+        client = make_client(
+            use_cache=not no_cache,
+            cache_ttl=cache_ttl,
+            offline_path=offline_path,
+            index_url=index_url,
+            rate_limit=rate_limit,
+        )
+        try:
+            serve_forever(server_url or DEFAULT_SERVER_URL, client, ttl=cache_ttl)
+        except OSError as e:
+            raise click.ClickException(str(e)) from e
+        return
+
+    if not packages and not requirement_files and not outdated and not verify_paths:
+        message = "Missing argument 'PACKAGES...' or option '-r'."
+        raise click.UsageError(message)
+
+    # imported here so that --help, --version and usage errors don't pay for
+    # requests, urllib3 and rich
+    from packaging.utils import canonicalize_name
+
+    from .artifacts import (
+        FILE_SECTIONS,
+        file_rows,
+        iter_package_files,
+        parse_artifact_filename,
+        verify_file,
+    )
+    from .exceptions import WoppError
+    from .formats import get_writer, iter_records
+    from .requirements import dedupe_pins, installed_pins, parse_requirements_file
+    from .timings import TimingsReport
+    from .tree import resolve_tree
+    from .utils import parse_pkg_string, pretty, pretty_table
+    from .whatsonpypi import (
+        diff_versions,
+        iter_queries,
+        iter_scan_packages,
+        make_client,
+        run_queries,
+        run_query,
+        scan_packages,
+    )
+
+    show, show_table, echo = pretty, pretty_table, click.echo
+    report = None
+    if timings_format:
+        report = TimingsReport()
+        click.get_current_context().call_on_close(lambda: report.echo(timings_format))
+        show = report.timed("render", pretty)
+        show_table = report.timed("render", pretty_table)
+        echo = report.timed("render", click.echo)
+
+    writer = get_writer(output_format, sys.stdout) if output_format else None
+    if writer and report:
+        writer.write = report.timed("render", writer.write)  # type: ignore[method-assign]
+
+    if diff and len(packages) != 1:
+        message = "--diff compares two versions of a single package."
+        raise click.UsageError(message)
+
+    # the release of each file to verify, read from its filename, or from the package
+    # argument for files whose name doesn't tell
+    targets: list[tuple[str, str | None]] = []
+    for path in verify_paths:
+        target: tuple[str, str | None] | None = parse_artifact_filename(path)
+        if target is None and packages:
+            package_, version, _ = parse_pkg_string(packages[0])
+            target = (package_ or packages[0], version)
+        if target is None:
+            message = f"Can't tell the release of {path}; pass its package, e.g. 'demo==1.0'."
+            raise click.UsageError(message)
+        targets.append(target)
+
+    failed = 0
+    total = len(packages)
+    failure = "{failed} of {total} packages could not be fetched."
+    results: list[Any] = []
     try:
-        # get version if given
-        package_, version, _ = parse_pkg_string(package)
-        result = run_query(
-            package_ or package,  # parsed package name can be None
-            version,
-            more,
-            docs,
-            page,
-            history,
+        # a zero TTL makes every cached response go through revalidation
+        client = make_client(
+            use_cache=not no_cache,
+            cache_ttl=0 if refresh else cache_ttl,
+            offline_path=offline_path,
+            index_url=index_url,
+            timing_hook=report.add if report else None,
+            # the server answers from its own cache
+            server_url=None if no_cache or refresh else server_url,
+            rate_limit=rate_limit,
         )
-        # output is not always expected and might be None sometimes.
-        if result:
-            pretty(result)
+        if tree:
+            roots = [(package, parse_pkg_string(package)[1]) for package in packages]
+            for path in requirement_files:
+                roots.extend((name, version) for name, version, _ in parse_requirements_file(path))
+            dependencies = resolve_tree(roots, client, depth)
+            if writer:
+                for record in dependencies.iter_edges():
+                    writer.write(record)
+                writer.close()
+            else:
+                echo(dependencies.format())
+            click.echo(dependencies.summary(), err=True)
+            failed = sum(dependencies.nodes[key].error is not None for key in dependencies.roots)
+            total = len(roots)
+        elif diff:
+            old_version, new_version = diff
+            # extras and pins are dropped; the versions to compare are the ones given
+            package = parse_pkg_string(packages[0])[0] or packages[0]
+            rows = diff_versions(package, old_version, new_version, client)
+            if writer:
+                for row in rows:
+                    writer.write({"package": package, **row})
+                writer.close()
+            elif rows:
+                show_table(rows, title=f"📦 {package} {old_version} → {new_version}")
+            else:
+                click.echo(f"No differences between {old_version} and {new_version}.", err=True)
+            return
+        elif verify_paths:
+            verified = client.request_many(targets, sections=FILE_SECTIONS)
+            rows = []
+            for path, release in zip(verify_paths, verified):
+                if isinstance(release, WoppError):
+                    rows.append({"file": path, "status": "not found", "error": str(release)})
+                else:
+                    rows.append(verify_file(path, release))
+            if writer:
+                for row in rows:
+                    writer.write(row)
+                writer.close()
+            else:
+                show_table(rows, title="🔒 Verified files")
+            failed = sum(row["status"] != "ok" for row in rows)
+            total = len(rows)
+            failure = "{failed} of {total} files don't match the digests published on the index."
+        elif outdated:
+            pins = installed_pins()
+            if packages:
+                wanted = {canonicalize_name(parse_pkg_string(p)[0] or p) for p in packages}
+                pins = [pin for pin in pins if canonicalize_name(pin[0]) in wanted]
+            if writer:
+                for _, row in iter_scan_packages(pins, client):
+                    if row["status"] == "outdated":
+                        writer.write(row)
+                writer.close()
+                return
+            rows = [row for row in scan_packages(pins, client) if row["status"] == "outdated"]
+            if rows:
+                show_table(rows)
+            else:
+                click.echo(f"All {len(pins)} installed packages are up to date.", err=True)
+            return
+        elif requirement_files:
+            pins = []
+            for package in packages:
+                package_, version, specifier = parse_pkg_string(package)
+                pins.append((package_ or package, version, specifier))
+            for path in requirement_files:
+                pins.extend(parse_requirements_file(path))
+            pins = dedupe_pins(pins)
+            if writer:
+                for _, row in iter_scan_packages(pins, client):
+                    writer.write(row)
+                writer.close()
+            else:
+                show_table(scan_packages(pins, client))
+            return
+        else:
+            specs = []
+            for package in packages:
+                package_, version, specifier = parse_pkg_string(package)
+                # parsed package name can be None
+                specs.append(
+                    (package_ or package, version, specifier if specifier != "==" else None)
+                )
+
+            if files:
+                outcomes = iter_package_files([spec[:2] for spec in specs], client)
+                if writer:
+                    for index, found in outcomes:
+                        failed += isinstance(found, WoppError)
+                        records = (
+                            [{"error": str(found)}] if isinstance(found, WoppError) else found.files
+                        )
+                        for record in records:
+                            writer.write({"package": packages[index], **record})
+                    writer.close()
+                else:
+                    results = [found for _, found in sorted(outcomes, key=lambda o: o[0])]
+            elif writer:
+                # written in the order the packages come in, not the order they were asked for
+                queries = iter_queries(specs, more, docs, page, history, client, prereleases)
+                for index, outcome in queries:
+                    failed += isinstance(outcome, Exception)
+                    releases = history is not None or specs[index][2] is not None
+                    for record in iter_records(packages[index], outcome, releases):
+                        writer.write(record)
+                writer.close()
+            elif len(packages) == 1:
+                package, version, specifier = specs[0]
+                result = run_query(
+                    package, version, more, docs, page, history, client, specifier, prereleases
+                )
+                # output is not always expected and might be None sometimes.
+                if result:
+                    show(result)
+                return
+            else:
+                results = run_queries(specs, more, docs, page, history, client, prereleases)
     except Exception as e:
         raise click.ClickException(str(e)) from e
 
+    for package, outcome in zip(packages, results):
+        if isinstance(outcome, Exception):
+            failed += 1
+            click.secho(f"{package}: {outcome}", fg="red", err=True)
+        elif files:
+            show_table(file_rows(outcome), title=f"📦 {outcome.name} {outcome.latest_version}")
+        elif outcome:
+            show(outcome)
+    if failed:
+        message = failure.format(failed=failed, total=total)
+        raise click.ClickException(message)
+
 
 if __name__ == "__main__":
     main()  # pragma: no cover
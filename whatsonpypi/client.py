@@ -4,19 +4,46 @@ API client for querying PyPI JSON endpoints.
 
 from __future__ import annotations
 
+from collections.abc import Callable, Collection, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+import json
 from operator import itemgetter
-from typing import Any, TypeVar
+import threading
+import time
+from typing import Any, ClassVar, TypeVar, Union
 
-from requests import Request, Session, hooks
-from requests.adapters import HTTPAdapter
+from packaging.utils import canonicalize_name
+from requests import Response, Session, hooks
 from requests.exceptions import RequestException
 from requests.packages.urllib3.util.retry import Retry
 
-from .constants import PYPI_BASE_URL
-from .exceptions import PackageNotFoundError, PackageNotProvidedError
+from .cache import CacheEntry, DiskCache, MemoryCache
+from .constants import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_MAX_RETRY_AFTER,
+    DEFAULT_MAX_THROTTLE_RETRIES,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_POOL_SIZE,
+    PYPI_BASE_URL,
+)
+from .exceptions import (
+    PackageNotFoundError,
+    PackageNotProvidedError,
+    RateLimitError,
+    WoppError,
+)
+from .offline import OfflineIndex
+from .ratelimit import RateLimiter, parse_retry_after
+from .timings import RequestTimings, bytes_received, retry_count
+from .transports import OfflineTransport, RequestsTransport, Transport, drain_response
+from .utils import BODY_ERRORS, ReleaseRecord
+from .versions import VersionIndex
 
 T = TypeVar("T")
+PackageSpec = Union[str, tuple[str, Union[str, None]]]
+InFlightKey = tuple[str, Union[str, None], Union[frozenset[str], None]]
 
 
 class WoppResponse:
@@ -29,6 +56,15 @@ class WoppResponse:
         self.json: dict[str, Any] = json or {}
         self._cache: dict[str, Any] = {}
 
+    def encoded(self) -> bytes:
+        """
+        Returns the response as compact JSON. Memoised.
+        """
+        if "encoded" not in self._cache:
+            self._cache["encoded"] = json.dumps(self.json, separators=(",", ":")).encode("utf-8")
+        encoded: bytes = self._cache["encoded"]
+        return encoded
+
     def _get(self, key: str, expected_type: type[T], default: T) -> T:
         value = self.json.get(key, default)
         return value if isinstance(value, expected_type) else default
@@ -89,39 +125,63 @@ class WoppResponse:
     def latest_pkg_urls(self) -> dict[str, Any]:
         return self._get("latest_pkg_urls", dict, {})
 
+    @property
+    def files(self) -> list[dict[str, Any]]:
+        """
+        Returns every artifact of the release the response is for, with its digests.
+        """
+        return self._get("files", list, [])
+
     @property
     def releases(self) -> list[str]:
         value = self.json.get("releases")
         return list(value) if isinstance(value, list) else []
 
+    @property
+    def release_files(self) -> dict[str, list[Any]]:
+        """
+        Returns the compact row of the file picked for each release, keyed by version.
+        """
+        return self._get("release_files", dict, {})
+
+    def get_release_records(self) -> dict[str, ReleaseRecord]:
+        """
+        Returns a ReleaseRecord for each release that has files, keyed by version.
+
+        Built from the compact rows on first access and memoised.
+        """
+        if "release_records" not in self._cache:
+            self._cache["release_records"] = {
+                release: ReleaseRecord.from_row(release, row)
+                for release, row in self.release_files.items()
+            }
+        records: dict[str, ReleaseRecord] = self._cache["release_records"]
+        return records
+
     @property
     def release_data(self) -> dict[str, dict[str, Any]]:
         """
         Returns a dictionary of release data keyed by version.
         """
-        return self._get("release_info", dict, {})
+        return {release: record.to_dict() for release, record in self.get_release_records().items()}
 
     def get_release_info(self, release_version: str) -> dict[str, Any]:
         """
         Returns the release information for a specific release version.
         """
-        return self.release_data.get(release_version, {})
+        record = self.get_release_records().get(release_version)
+        return record.to_dict() if record else {}
 
     def get_releases_with_dates(self) -> list[tuple[str, datetime]]:
         """
         Returns a list of releases with their upload dates.
         """
+        records = self.get_release_records()
         releases_with_dates = []
         for release in self.releases:
-            info = self.release_data.get(release, {})
-            if info:
-                upload_time = info.get("upload_time")
-                if isinstance(upload_time, str):
-                    try:
-                        release_date = datetime.fromisoformat(upload_time.replace("Z", "+00:00"))
-                        releases_with_dates.append((release, release_date))
-                    except ValueError:
-                        continue
+            record = records.get(release)
+            if record and record.upload_time:
+                releases_with_dates.append((release, record.upload_time))
         return releases_with_dates
 
     def get_sorted_releases(self) -> list[str]:
@@ -143,6 +203,19 @@ class WoppResponse:
         sorted_versions: list[str] = self._cache["sorted_releases"]
         return sorted_versions
 
+    @property
+    def version_index(self) -> VersionIndex:
+        """
+        Returns every release, including ones without files, in PEP 440 order.
+        """
+        if "version_index" not in self._cache:
+            yanked = {
+                release for release, record in self.get_release_records().items() if record.yanked
+            }
+            self._cache["version_index"] = VersionIndex(self.releases, yanked)
+        index: VersionIndex = self._cache["version_index"]
+        return index
+
     def get_latest_releases(self, n: int = 10) -> list[str]:
         """
         Returns the latest `n` releases sorted by upload time (most recent first).
@@ -150,18 +223,26 @@ class WoppResponse:
         return self.get_sorted_releases()[:n]
 
 
-class WoppClient:
+class BaseWoppClient:
     """
-    Synchronous client for accessing the PyPI JSON API.
+    Shared configuration for the synchronous and asynchronous PyPI clients.
     """
 
+    headers: ClassVar[dict[str, str]] = {
+        "Accept": "application/json",
+        "User-Agent": "https://github.com/viseshrp/whatsonpypi",
+    }
+
     def __init__(
         self,
-        pool_connections: bool = True,
         request_hooks: dict[str, Any] | None = None,
+        base_url: str | None = None,
     ) -> None:
-        self.base_url: str = PYPI_BASE_URL
-        self.session: Session | None = Session() if pool_connections else None
+        """
+        :param request_hooks: requests hooks to run on each response
+        :param base_url: URL of the JSON API of the package index; defaults to PyPI
+        """
+        self.base_url: str = (base_url or PYPI_BASE_URL).rstrip("/")
         self.request_hooks: dict[str, list[Any]] = request_hooks or hooks.default_hooks()
 
     def _build_url(
@@ -183,12 +264,85 @@ class WoppClient:
             else f"{self.base_url}/{package}/json"
         )
 
+
+class _InFlight:
+    """
+    A request being made, that callers asking for the same thing can wait on.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.response: WoppResponse | None = None
+        self.error: BaseException | None = None
+
+
+class WoppClient(BaseWoppClient):
+    """
+    Synchronous client for accessing the PyPI JSON API.
+    """
+
+    def __init__(
+        self,
+        pool_connections: bool = True,
+        request_hooks: dict[str, Any] | None = None,
+        cache: DiskCache | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        retries: int | Retry = DEFAULT_MAX_RETRIES,
+        offline: OfflineIndex | None = None,
+        base_url: str | None = None,
+        transport: Transport | None = None,
+        timing_hook: Callable[[RequestTimings], Any] | None = None,
+        rate_limiter: RateLimiter | None = None,
+        memory_cache: MemoryCache | None = None,
+    ) -> None:
+        """
+        :param pool_connections: Keep one session, and its connection pool, for all requests
+        :param request_hooks: requests hooks to run on each response
+        :param cache: Optional on-disk cache of cleaned responses
+        :param pool_size: Number of per-host connection pools to keep
+        :param pool_maxsize: Connections kept alive per host; keep it >= the batch concurrency
+        :param retries: Retry attempts for failed requests, or a urllib3 `Retry` policy
+            (429s are taken out of it; the client's rate limiter retries those)
+        :param offline: Answer every request from this local mirror instead of the network
+        :param base_url: URL of the JSON API of the package index; defaults to PyPI
+        :param transport: Sends the requests; defaults to HTTP over a pooled requests session,
+            configured by the options above
+        :param timing_hook: Called with the `RequestTimings` of every request, cache hits
+            and failures included. It may be called from worker threads.
+        :param rate_limiter: Paces the requests sent through `transport`. Defaults to one
+            without limits, which only slows down once the index answers 429.
+        :param memory_cache: Optional in-process cache of responses, checked before
+            the on-disk cache. Hits return the same shared `WoppResponse` objects.
+        """
+        super().__init__(request_hooks, base_url)
+        self.cache: DiskCache | None = cache
+        if transport is None:
+            if offline:
+                transport = OfflineTransport(offline, self.base_url)
+            else:
+                transport = RequestsTransport(pool_connections, pool_size, pool_maxsize, retries)
+        self.transport: Transport = transport
+        self.timing_hook: Callable[[RequestTimings], Any] | None = timing_hook
+        self.rate_limiter: RateLimiter = rate_limiter or RateLimiter()
+        self.memory_cache: MemoryCache | None = memory_cache
+        self._in_flight: dict[InFlightKey, _InFlight] = {}
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def session(self) -> Session | None:
+        """
+        The shared requests session, if the client talks HTTP through one.
+        """
+        return self.transport.session if isinstance(self.transport, RequestsTransport) else None
+
     def request(
         self,
         package: str | None = None,
         version: str | None = None,
         timeout: float = 3.1,
-        max_retries: int = 3,
+        max_retries: int | None = None,
+        sections: Collection[str] | None = None,
     ) -> WoppResponse:
         """
         Sends a GET request to the PyPI API and returns a structured WoppResponse.
@@ -196,7 +350,10 @@ class WoppClient:
         :param package: The package name to query
         :param version: Optional version string
         :param timeout: Request timeout in seconds
-        :param max_retries: Retry attempts for failed requests
+        :param max_retries: Retry attempts for failed requests. Defaults to the client's
+            retry policy; passing a value uses a throwaway session without pooled connections.
+        :param sections: Top-level sections of the document the response hooks should keep,
+            e.g. only "info" when the releases aren't needed. Defaults to all of them.
         :return: WoppResponse object with parsed data
         :raises PackageNotProvidedError: if package is None
         :raises PackageNotFoundError: if the PyPI API returns 404 or 5xx status codes
@@ -204,39 +361,270 @@ class WoppClient:
         if package is None:
             raise PackageNotProvidedError
 
+        transport = self._get_transport(max_retries)
+        try:
+            return self._send(transport, package, version, timeout, sections)
+        finally:
+            if transport is not self.transport:
+                transport.close()
+
+    def request_many(
+        self,
+        packages: Iterable[PackageSpec],
+        timeout: float = 3.1,
+        max_retries: int | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        sections: Collection[str] | None = None,
+    ) -> list[WoppResponse | WoppError]:
+        """
+        Fetches several packages concurrently over a bounded thread pool.
+
+        All requests share the client's transport, i.e. one pooled session by default.
+        Results are returned in input order; a package that fails yields its exception
+        in place of a response.
+
+        :param packages: Package names, or (package, version) tuples
+        :param timeout: Request timeout in seconds, per package
+        :param max_retries: Retry attempts for failed requests, per package.
+            Defaults to the client's retry policy.
+        :param max_workers: Upper bound on concurrent requests
+        :param sections: Top-level sections of the documents the response hooks should keep
+        :return: List of WoppResponse or WoppError objects, one per input package
+        """
+        specs = list(packages)
+        results = dict(self.iter_many(specs, timeout, max_retries, max_workers, sections))
+        return [results[i] for i in range(len(specs))]
+
+    def iter_many(
+        self,
+        packages: Iterable[PackageSpec],
+        timeout: float = 3.1,
+        max_retries: int | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        sections: Collection[str] | None = None,
+    ) -> Iterator[tuple[int, WoppResponse | WoppError]]:
+        """
+        Like `request_many`, but yields each result as soon as it arrives.
+
+        :return: Iterator of (input position, WoppResponse or WoppError), in completion order
+        """
+        specs = [(spec, None) if isinstance(spec, str) else spec for spec in packages]
+        if not specs:
+            return
+
+        transport = self._get_transport(max_retries)
+
+        def _fetch(spec: tuple[str, str | None]) -> WoppResponse | WoppError:
+            try:
+                return self._send(transport, spec[0], spec[1], timeout, sections)
+            except WoppError as e:
+                return e
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(specs)))) as executor:
+                futures = {executor.submit(_fetch, spec): i for i, spec in enumerate(specs)}
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+        finally:
+            if transport is not self.transport:
+                transport.close()
+
+    def invalidate(self, package: str, version: str | None = None) -> int:
+        """
+        Drops a package from the in-memory cache, so that it is looked up again.
+
+        :param package: The package name
+        :param version: Drop this version rather than the latest one
+        :return: number of responses dropped
+        """
+        if self.memory_cache is None:
+            return 0
+        return self.memory_cache.invalidate(self._build_url(canonicalize_name(package), version))
+
+    @staticmethod
+    def _cache_key(url: str, sections: Collection[str] | None) -> str:
+        # projections are cached apart from full documents
+        return url if sections is None else f"{url}#{','.join(sorted(sections))}"
+
+    def _get_transport(self, max_retries: int | None) -> Transport:
+        """
+        Returns the client's transport, or a throwaway one if a one-off retry count was asked for.
+        """
+        if max_retries is not None:
+            return self.transport.with_retries(max_retries)
+        return self.transport
+
+    def _send(
+        self,
+        transport: Transport,
+        package: str,
+        version: str | None,
+        timeout: float,
+        sections: Collection[str] | None = None,
+    ) -> WoppResponse:
+        """
+        Performs the GET request through `transport` and reports its timings.
+
+        Concurrent calls for the same package, version and sections are coalesced:
+        the first one makes the request, and the rest wait for it and share its
+        response (or its error).
+        """
         url = self._build_url(package, version)
-        req_kwargs = {
-            "method": "GET",
-            "url": url,
-            "hooks": self.request_hooks,
-            "headers": {
-                "Accept": "application/json",
-                "User-Agent": "https://github.com/viseshrp/whatsonpypi",
-            },
-        }
-
-        session = self.session or Session()
-        request = Request(**req_kwargs)
-        prepared_request = session.prepare_request(request)
-
-        retries = Retry(
-            total=max_retries,
-            backoff_factor=0.1,
-            status_forcelist=[500, 502, 503, 504],
+        timings = RequestTimings(package, version, url)
+        # by canonical name, so that e.g. "Django" and "django" share an entry
+        cache_key = self._cache_key(self._build_url(canonicalize_name(package), version), sections)
+        if self.memory_cache is not None:
+            cached = self.memory_cache.get(cache_key)
+            if cached is not None:
+                timings.cache = "memory"
+                timings.status_code = cached.status_code
+                if self.timing_hook:
+                    self.timing_hook(timings.finish())
+                return cached
+
+        key = (
+            canonicalize_name(package),
+            version,
+            frozenset(sections) if sections is not None else None,
         )
-        adapter = HTTPAdapter(max_retries=retries)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+        with self._in_flight_lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if call is None:
+                call = self._in_flight[key] = _InFlight()
+
+        try:
+            if leader:
+                try:
+                    call.response = self._fetch(transport, url, timeout, sections, timings)
+                    if self.memory_cache is not None:
+                        self.memory_cache.set(cache_key, call.response)
+                except BaseException as e:
+                    call.error = e
+                    raise
+                finally:
+                    with self._in_flight_lock:
+                        del self._in_flight[key]
+                    call.done.set()
+            else:
+                timings.cache = "shared"
+                call.done.wait()
+                timings.stages["wait"] = time.perf_counter() - timings.started
+            if call.response is None:
+                raise call.error or PackageNotFoundError
+            return call.response
+        finally:
+            if self.timing_hook:
+                self.timing_hook(timings.finish())
+
+    def _send_paced(
+        self,
+        transport: Transport,
+        url: str,
+        headers: dict[str, str],
+        timeout: float,
+        timings: RequestTimings,
+    ) -> Response:
+        """
+        Sends a request through the rate limiter, and retries it while the index answers 429.
+
+        :raises RateLimitError: if the index is still throttling after the last retry
+        """
+        for attempt in range(DEFAULT_MAX_THROTTLE_RETRIES + 1):
+            started = time.perf_counter()
+            ticket = self.rate_limiter.acquire()
+            waited = time.perf_counter() - started
+            if waited > 0.001:
+                timings.stages["throttle"] = timings.stages.get("throttle", 0.0) + waited
+
+            started = time.perf_counter()
+            try:
+                response = transport.send(url, headers, timeout)
+            except BaseException as e:
+                # whatever went wrong, the slot must be given back
+                self.rate_limiter.release(ticket)
+                if isinstance(e, RequestException):
+                    raise PackageNotFoundError from e
+                raise
+            finally:
+                timings.stages["request"] = timings.stages.get("request", 0.0) + (
+                    time.perf_counter() - started
+                )
+            if response.status_code != 429:
+                self.rate_limiter.release(ticket)
+                return response
+
+            drain_response(response)
+            response.close()
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = 0.5 * 2**attempt
+            self.rate_limiter.release(
+                ticket, throttled=True, retry_after=min(retry_after, DEFAULT_MAX_RETRY_AFTER)
+            )
+            timings.retries += 1
+        timings.status_code = 429
+        raise RateLimitError
+
+    def _fetch(
+        self,
+        transport: Transport,
+        url: str,
+        timeout: float,
+        sections: Collection[str] | None,
+        timings: RequestTimings,
+    ) -> WoppResponse:
+        """
+        Serves a request from the cache, or through `transport`, and runs the response hooks.
+        """
+        key = self._cache_key(url, sections)
+        entry = None
+        if self.cache:
+            started = time.perf_counter()
+            entry = self.cache.get(key)
+            timings.stages["cache"] = time.perf_counter() - started
+            timings.cache = "miss"
+            if entry and entry.is_fresh(self.cache.ttl):
+                timings.cache = "hit"
+                timings.status_code = 200
+                return WoppResponse(200, entry.data)
+
+        headers = {**self.headers, **entry.validators} if entry else self.headers
+        response = self._send_paced(transport, url, headers, timeout, timings)
+        timings.status_code = response.status_code
+        timings.retries += retry_count(response)
 
         try:
-            response = session.send(
-                prepared_request,
-                timeout=timeout,
-                allow_redirects=True,
+            response = hooks.dispatch_hook(
+                "response", self.request_hooks, response, sections=sections
             )
-            if response.status_code == 404 or response.status_code >= 500:
-                raise PackageNotFoundError  # Treat all 5xx as failure to find package
-        except RequestException as e:
+        except BODY_ERRORS as e:
+            # a truncated or malformed body fails this package only
             raise PackageNotFoundError from e
-
-        return WoppResponse(response.status_code, getattr(response, "cleaned_json", None))
+        finally:
+            # the hooks are done with the body; hand the connection back to the pool
+            drain_response(response)
+            timings.bytes_received = bytes_received(response)
+            response.close()
+        timings.stages.update(getattr(response, "clean_timings", {}))
+        if response.status_code == 404 or response.status_code >= 500:
+            raise PackageNotFoundError  # Treat all 5xx as failure to find package
+
+        cleaned_json = getattr(response, "cleaned_json", None)
+        if self.cache:
+            if entry and response.status_code == 304:
+                # still valid, restart its TTL and reuse the stored document
+                timings.cache = "revalidated"
+                self.cache.set(key, CacheEntry(entry.data, entry.etag, entry.last_modified))
+                return WoppResponse(200, entry.data)
+            if response.status_code == 200 and cleaned_json is not None:
+                self.cache.set(
+                    key,
+                    CacheEntry(
+                        cleaned_json,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                    ),
+                )
+
+        return WoppResponse(response.status_code, cleaned_json)
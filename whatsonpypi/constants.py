@@ -1,4 +1,16 @@
 from typing import Final
 
 PYPI_BASE_URL: Final[str] = "https://pypi.org/pypi"
-REQ_LINE_REGEX: Final[str] = r"^(?P<package>[A-Za-z0-9_\-\.]+)==(?P<version>[A-Za-z0-9_\.\-]+)$"
+DEFAULT_MAX_WORKERS: Final[int] = 8
+DEFAULT_MAX_RETRIES: Final[int] = 3
+DEFAULT_POOL_SIZE: Final[int] = 10
+DEFAULT_POOL_MAXSIZE: Final[int] = 10
+DEFAULT_CACHE_TTL: Final[float] = 600.0
+DEFAULT_CACHE_MAX_SIZE: Final[int] = 200 * 1024 * 1024
+# top-level sections of a project document that responses can be projected to
+PROJECT_SECTIONS: Final[frozenset[str]] = frozenset({"info", "releases", "urls"})
+DEFAULT_SERVER_URL: Final[str] = "http://127.0.0.1:7790"
+DEFAULT_MEMORY_CACHE_SIZE: Final[int] = 1024
+DEFAULT_MAX_THROTTLE_RETRIES: Final[int] = 5
+DEFAULT_MAX_RETRY_AFTER: Final[float] = 60.0
+DEFAULT_HASH_CHUNK_SIZE: Final[int] = 1024 * 1024
@@ -46,3 +46,15 @@ class URLLaunchError(WoppError):
     """Raised when there's a problem opening a URL in the browser."""
 
     detail: str = "There was a problem opening the URL in your browser."
+
+
+class MissingDependencyError(WoppError):
+    """Raised when an optional dependency needed for a feature is not installed."""
+
+    detail: str = "An optional dependency needed for this feature is not installed."
+
+
+class RateLimitError(WoppError):
+    """Raised when the package index keeps throttling requests."""
+
+    detail: str = "The package index is rate limiting requests (HTTP 429). Try again later."
@@ -0,0 +1,143 @@
+"""
+Machine-readable output, written one record at a time as results come in.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+import csv
+import json
+from typing import Any, TextIO
+
+from .exceptions import WoppError
+
+OUTPUT_FORMATS: tuple[str, ...] = ("json", "ndjson", "csv")
+
+
+def iter_records(
+    package: str,
+    outcome: dict[str, Any] | WoppError | None,
+    releases: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """
+    Flattens the outcome of a query into records.
+
+    :param package: package as it was asked for
+    :param outcome: output of the query, or the error raised
+    :param releases: is the output a release history, keyed by version?
+        Each release then becomes a record of its own.
+    :return: iterator of records, each starting with the package
+    """
+    if isinstance(outcome, WoppError):
+        yield {"package": package, "error": str(outcome)}
+    elif outcome and releases:
+        for version, info in outcome.items():
+            yield {"package": package, "version": version, **info}
+    elif outcome:
+        yield {"package": package, **outcome}
+
+
+class RecordWriter(ABC):
+    """
+    Writes records to a stream, flushing after each one so readers get them right away.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream: TextIO = stream
+
+    @abstractmethod
+    def write(self, record: dict[str, Any]) -> None:
+        """
+        Writes one record.
+        """
+
+    def close(self) -> None:
+        self.stream.flush()
+
+
+class NdjsonWriter(RecordWriter):
+    """
+    One JSON object per line.
+    """
+
+    def write(self, record: dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record, default=str) + "\n")
+        self.stream.flush()
+
+
+class JsonWriter(RecordWriter):
+    """
+    A JSON array, with one record per line.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        super().__init__(stream)
+        self.count: int = 0
+
+    def write(self, record: dict[str, Any]) -> None:
+        self.stream.write(("[\n" if not self.count else ",\n") + json.dumps(record, default=str))
+        self.stream.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        self.stream.write("\n]\n" if self.count else "[]\n")
+        super().close()
+
+
+class CsvWriter(RecordWriter):
+    """
+    CSV with a header row. Nested values are written as JSON.
+
+    The columns are those of the first record without an error, plus `error`.
+    Errors that come in before it are held back until the header is known.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        super().__init__(stream)
+        self.writer: csv.DictWriter[str] | None = None
+        self.pending: list[dict[str, Any]] = []
+
+    def write(self, record: dict[str, Any]) -> None:
+        if self.writer is None:
+            if "error" in record:
+                self.pending.append(record)
+                return
+            self.writer = self._start([*record, "error"])
+        self._write_row(self.writer, record)
+
+    def _start(self, columns: list[str]) -> csv.DictWriter[str]:
+        writer = csv.DictWriter(
+            self.stream, fieldnames=columns, extrasaction="ignore", lineterminator="\n"
+        )
+        writer.writeheader()
+        for record in self.pending:
+            self._write_row(writer, record)
+        self.pending = []
+        return writer
+
+    def _write_row(self, writer: csv.DictWriter[str], record: dict[str, Any]) -> None:
+        writer.writerow(
+            {
+                key: json.dumps(value, default=str) if isinstance(value, (dict, list)) else value
+                for key, value in record.items()
+            }
+        )
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self.writer is None and self.pending:
+            self.writer = self._start(["package", "error"])
+        super().close()
+
+
+def get_writer(output_format: str, stream: TextIO) -> RecordWriter:
+    """
+    Returns a writer for one of `OUTPUT_FORMATS`.
+    """
+    writers: dict[str, type[RecordWriter]] = {
+        "json": JsonWriter,
+        "ndjson": NdjsonWriter,
+        "csv": CsvWriter,
+    }
+    return writers[output_format](stream)
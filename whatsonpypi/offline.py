@@ -0,0 +1,99 @@
+"""
+Offline lookups from a local PyPI mirror directory or a bulk snapshot file.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from packaging.utils import canonicalize_name
+
+
+class OfflineIndex:
+    """
+    Answers PyPI JSON API lookups from local files instead of the network.
+
+    `path` can be:
+
+    - a directory laid out like the API, i.e. `<package>/json` and
+      `<package>/<version>/json` (or `<package>.json`), read on demand, or
+    - a snapshot file of project documents, either JSON lines (`.jsonl`/`.ndjson`)
+      or a JSON list or name-keyed mapping (`.json`), optionally gzipped.
+      Snapshots are loaded once, and all lookups are then answered from memory.
+
+    Documents are kept as raw JSON bytes, so they go through the same response
+    hooks as documents downloaded from PyPI.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path: Path = Path(path)
+        self.documents: dict[tuple[str, str | None], bytes] = {}
+        if not self.path.is_dir():
+            self._load_snapshot()
+
+    def _open(self) -> gzip.GzipFile | BinaryIO:
+        if self.path.suffix == ".gz":
+            return gzip.open(self.path, "rb")
+        return self.path.open("rb")
+
+    def _load_snapshot(self) -> None:
+        with self._open() as f:
+            suffixes = self.path.suffixes
+            if ".jsonl" in suffixes or ".ndjson" in suffixes:
+                for line in f:
+                    if line.strip():
+                        self._add(json.loads(line), line.strip())
+                return
+            data = json.load(f)
+
+        documents = data.values() if isinstance(data, dict) else data
+        for document in documents:
+            self._add(document, json.dumps(document).encode("utf-8"))
+
+    def _add(self, document: dict[str, Any], body: bytes) -> None:
+        info = document.get("info") or {}
+        name = info.get("name")
+        if not name:
+            return
+        name = canonicalize_name(name)
+        if "releases" in document:
+            self.documents[(name, None)] = body
+            # a project document also describes its latest version,
+            # unless the snapshot has that version's own document
+            self.documents.setdefault((name, info.get("version")), body)
+        else:
+            self.documents[(name, info.get("version"))] = body
+
+    def _read(self, package: str, version: str | None) -> bytes | None:
+        parts = [package, version, "json"] if version else [package, "json"]
+        candidates = [self.path.joinpath(*parts)]
+        if not version:
+            candidates.append(self.path / f"{package}.json")
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate.read_bytes()
+        return None
+
+    def get(self, package: str, version: str | None = None) -> bytes | None:
+        """
+        Returns the raw JSON document for a package or one of its versions, if available.
+
+        :param package: The package name
+        :param version: Optional version
+        :return: JSON bytes, or None if the mirror doesn't have it
+        """
+        key = (canonicalize_name(package), version)
+        if key in self.documents:
+            return self.documents[key]
+        if not self.path.is_dir():
+            return None
+
+        body = self._read(package, version)
+        if body is None and key[0] != package:
+            body = self._read(key[0], version)
+        if body is not None:
+            self.documents[key] = body
+        return body
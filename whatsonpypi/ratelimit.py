@@ -0,0 +1,126 @@
+"""
+Client-wide rate limiting, with concurrency that adapts to throttling by the index.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import math
+import threading
+import time
+from typing import Any
+
+
+class RateLimiter:
+    """
+    Limits how fast and how many requests a client sends, and backs off when throttled.
+
+    Each request takes a token from a bucket that refills at `rate` tokens per second,
+    holding up to `burst`, and a slot under the concurrency limit. The limit follows AIMD:
+    it grows by about one slot per round of successful requests, and halves when the index
+    answers 429, after which nothing is sent until its Retry-After has passed.
+
+    Without a `rate` or `max_concurrency`, nothing is limited until the index throttles.
+    One limiter can be shared between clients talking to the same index.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: float | None = None,
+        max_concurrency: int | None = None,
+        min_concurrency: int = 1,
+    ) -> None:
+        """
+        :param rate: Requests per second to allow on average; unlimited if None
+        :param burst: Requests that can be sent at once after a quiet spell; defaults to `rate`
+        :param max_concurrency: Upper bound on requests in flight; unlimited if None
+        :param min_concurrency: Lower bound the limit is never halved below
+        """
+        self.rate: float | None = rate
+        self.burst: float = burst or max(1.0, rate or 1.0)
+        self.max_concurrency: float = max_concurrency or math.inf
+        self.min_concurrency: int = min_concurrency
+        # current concurrency limit, moved by AIMD
+        self.limit: float = self.max_concurrency
+        self.in_flight: int = 0
+        # number of 429s seen
+        self.throttled: int = 0
+        self.tokens: float = self.burst
+        self.paused_until: float = 0.0
+        # bumped on every decrease, so that a burst of 429s to requests sent at the
+        # same time only halves the limit once
+        self.generation: int = 0
+        self._refilled: float = time.monotonic()
+        self._cond = threading.Condition()
+
+    def acquire(self) -> int:
+        """
+        Blocks until a request may be sent, and takes a token and a slot for it.
+
+        :return: ticket to pass to `release`
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    self._cond.wait(self.paused_until - now)
+                elif self.in_flight >= self.limit:
+                    # woken up by `release`
+                    self._cond.wait()
+                elif self.rate is not None and self.tokens < 1:
+                    self._cond.wait((1 - self.tokens) / self.rate)
+                else:
+                    break
+            if self.rate is not None:
+                self.tokens -= 1
+            self.in_flight += 1
+            return self.generation
+
+    def release(self, ticket: int, throttled: bool = False, retry_after: float = 0.0) -> None:
+        """
+        Gives back the slot of a request once its response came in.
+
+        :param ticket: what `acquire` returned for the request
+        :param throttled: did the index answer 429?
+        :param retry_after: seconds to send nothing for, when throttled
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                if ticket == self.generation:
+                    self.generation += 1
+                    self.limit = max(
+                        self.min_concurrency, math.floor(min(self.limit, self.in_flight + 1) / 2)
+                    )
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            elif self.limit < self.max_concurrency:
+                self.limit = min(self.limit + 1 / self.limit, self.max_concurrency)
+            self._cond.notify_all()
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+
+def parse_retry_after(value: Any) -> float | None:
+    """
+    Returns the seconds to wait from a Retry-After header, given in seconds or as a date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,147 @@
+"""
+Parsing of requirements files, pyproject.toml and uv.lock into package pins,
+and listing of installed packages.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from importlib import metadata
+import json
+from pathlib import Path
+import sys
+from typing import Any, Optional
+
+from packaging.utils import canonicalize_name
+
+from .utils import parse_pkg_string
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:  # pragma: no cover
+    import tomli as tomllib
+
+PackagePin = tuple[str, Optional[str], Optional[str]]
+
+
+def _parse_requirement_lines(path: Path, seen_files: set[Path]) -> list[str]:
+    """
+    Returns the requirement strings of a pip requirements file, following `-r` includes.
+    """
+    path = path.resolve()
+    if path in seen_files:
+        return []
+    seen_files.add(path)
+
+    requirements = []
+    # join backslash continuations, then drop comments
+    content = path.read_text(encoding="utf-8").replace("\\\n", " ")
+    for raw_line in content.splitlines():
+        line = raw_line.split(" #", 1)[0].strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith(("-r ", "--requirement ", "-c ", "--constraint ")):
+            included = line.split(None, 1)[1].strip()
+            requirements.extend(_parse_requirement_lines(path.parent / included, seen_files))
+            continue
+        if line.startswith("-"):
+            # editable installs, index options and the like
+            continue
+        # per-requirement options such as --hash
+        requirements.append(line.split(" --", 1)[0].strip())
+    return requirements
+
+
+def _parse_pyproject(data: dict[str, Any]) -> list[str]:
+    """
+    Returns the requirement strings declared in a pyproject.toml.
+    """
+    project = data.get("project", {})
+    requirements = list(project.get("dependencies", []))
+    for extra in project.get("optional-dependencies", {}).values():
+        requirements.extend(extra)
+    for group in data.get("dependency-groups", {}).values():
+        # skip {include-group = "..."} tables
+        requirements.extend(item for item in group if isinstance(item, str))
+    return requirements
+
+
+def _parse_uv_lock(data: dict[str, Any]) -> list[str]:
+    """
+    Returns exact pins for every registry package in a uv.lock.
+    """
+    requirements = []
+    for package in data.get("package", []):
+        source = package.get("source", {})
+        name, version = package.get("name"), package.get("version")
+        # skip the project itself and other local packages
+        if not name or not version or "editable" in source or "virtual" in source:
+            continue
+        requirements.append(f"{name}=={version}")
+    return requirements
+
+
+def dedupe_pins(pins: Iterable[PackagePin]) -> list[PackagePin]:
+    """
+    Drops repeated packages, comparing normalized names and keeping the first one seen.
+    """
+    unique: dict[str, PackagePin] = {}
+    for pin in pins:
+        unique.setdefault(canonicalize_name(pin[0]), pin)
+    return list(unique.values())
+
+
+def parse_requirements_file(path: str | Path) -> list[PackagePin]:
+    """
+    Extract package pins from a requirements file, a pyproject.toml or a uv.lock.
+
+    Entries are deduplicated by normalized package name, keeping the first one seen.
+    Lines that aren't plain PEP 508 requirements (URLs, local paths) are skipped.
+
+    :param path: path to the file
+    :return: list of (package name, version, specifier), as from `parse_pkg_string`
+    """
+    path = Path(path)
+    if path.suffix in (".toml", ".lock"):
+        with path.open("rb") as f:
+            data = tomllib.load(f)
+        if "package" in data and "project" not in data:
+            lines = _parse_uv_lock(data)
+        else:
+            lines = _parse_pyproject(data)
+    else:
+        lines = _parse_requirement_lines(path, set())
+
+    pins = []
+    for line in lines:
+        name, version, specifier = parse_pkg_string(line)
+        # anything that didn't parse as a requirement comes back as-is
+        if not name or any(c in name for c in "/:@ "):
+            continue
+        pins.append((name, version, specifier))
+    return dedupe_pins(pins)
+
+
+def installed_pins(path: Sequence[str] | None = None) -> list[PackagePin]:
+    """
+    Returns an exact pin for every distribution installed in an environment.
+
+    Packages installed from a local directory (e.g. editable installs) are skipped,
+    as they usually aren't on the index.
+
+    :param path: directories to look for distributions in; defaults to `sys.path`
+    :return: list of (package name, version, "=="), sorted by name
+    """
+    pins = []
+    for dist in metadata.distributions(path=list(path) if path is not None else sys.path):
+        name = dist.metadata["Name"]
+        if not name or not dist.version:
+            continue
+        try:
+            direct_url = json.loads(dist.read_text("direct_url.json") or "{}")
+        except ValueError:
+            direct_url = {}
+        if "dir_info" in direct_url:
+            continue
+        pins.append((name, dist.version, "=="))
+    return dedupe_pins(sorted(pins, key=lambda pin: canonicalize_name(pin[0])))
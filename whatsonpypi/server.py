@@ -0,0 +1,172 @@
+"""
+Local server mode: a long-running process that keeps a warm `WoppClient` for `wopp` to use.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Collection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import time
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import click
+from requests.exceptions import RequestException
+
+from .cache import MemoryCache
+from .client import WoppClient, WoppResponse
+from .constants import DEFAULT_CACHE_TTL, DEFAULT_MEMORY_CACHE_SIZE
+from .exceptions import PackageNotFoundError, WoppError
+from .timings import RequestTimings, bytes_received
+from .transports import Transport, drain_response
+
+
+class WoppServer(ThreadingHTTPServer):
+    """
+    Answers lookups over HTTP with cleaned responses, from a shared client and an in-memory LRU.
+
+    It understands the same URLs as the PyPI JSON API (`/<package>/json` and
+    `/<package>/<version>/json`), plus a `sections` query parameter, and `/health`.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        client: WoppClient,
+        max_entries: int = DEFAULT_MEMORY_CACHE_SIZE,
+        ttl: float = DEFAULT_CACHE_TTL,
+    ) -> None:
+        """
+        :param address: (host, port) to listen on
+        :param client: client to look packages up with; given a `MemoryCache` unless it has one
+        :param max_entries: responses kept in memory
+        :param ttl: seconds a response is kept before it is looked up again
+        """
+        super().__init__(address, WoppRequestHandler)
+        if client.memory_cache is None:
+            client.memory_cache = MemoryCache(max_entries, ttl=ttl)
+        self.client: WoppClient = client
+
+    def lookup(
+        self,
+        package: str,
+        version: str | None = None,
+        sections: frozenset[str] | None = None,
+    ) -> bytes:
+        """
+        Returns the cleaned response for a package as JSON bytes.
+
+        :raises WoppError: if the package couldn't be looked up
+        """
+        return self.client.request(package, version, sections=sections).encoded()
+
+
+class WoppRequestHandler(BaseHTTPRequestHandler):
+    # keep-alive, so that thin clients can reuse their connections
+    protocol_version = "HTTP/1.1"
+    server: WoppServer
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts == ["health"]:
+            self._reply(200, {"status": "ok"})
+            return
+        if parts[-1] != "json" or len(parts) not in (2, 3):
+            self._reply(404, {"error": "Not found"})
+            return
+
+        query = parse_qs(url.query).get("sections")
+        sections = frozenset(query[0].split(",")) if query else None
+        try:
+            body = self.server.lookup(parts[0], parts[1] if len(parts) == 3 else None, sections)
+        except WoppError as e:
+            self._reply(404, {"error": str(e)})
+            return
+        self._send(200, body)
+
+    def _reply(self, status: int, data: dict[str, Any]) -> None:
+        self._send(status, json.dumps(data).encode("utf-8"))
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        # stay quiet; the server is mostly talked to by scripts
+        pass
+
+
+class ServerClient(WoppClient):
+    """
+    Thin client for a `wopp --serve` process. It gets cleaned responses, so no hooks run here.
+    """
+
+    def is_alive(self, timeout: float = 0.25) -> bool:
+        """
+        Checks whether the server is up.
+        """
+        try:
+            response = self.transport.send(f"{self.base_url}/health", self.headers, timeout)
+        except RequestException:
+            return False
+        drain_response(response)
+        response.close()
+        return response.status_code == 200
+
+    def _fetch(
+        self,
+        transport: Transport,
+        url: str,
+        timeout: float,
+        sections: Collection[str] | None,
+        timings: RequestTimings,
+    ) -> WoppResponse:
+        if sections is not None:
+            url = f"{url}?sections={','.join(sorted(sections))}"
+        started = time.perf_counter()
+        try:
+            response = transport.send(url, self.headers, timeout)
+        except RequestException as e:
+            timings.stages["request"] = time.perf_counter() - started
+            raise PackageNotFoundError from e
+        timings.status_code = response.status_code
+        try:
+            data = response.json() if response.status_code == 200 else None
+        except (RequestException, ValueError) as e:
+            raise PackageNotFoundError from e
+        finally:
+            timings.stages["request"] = time.perf_counter() - started
+            # hand the connection back to the pool, read or not
+            drain_response(response)
+            timings.bytes_received = bytes_received(response)
+            response.close()
+        if data is None:
+            raise PackageNotFoundError
+        return WoppResponse(200, data)
+
+
+def serve(server_url: str, client: WoppClient, ttl: float = DEFAULT_CACHE_TTL) -> None:
+    """
+    Serves lookups on the host and port of `server_url` until interrupted.
+
+    :param server_url: URL to listen on, e.g. http://127.0.0.1:7790
+    :param client: client to look packages up with
+    :param ttl: seconds a response is kept in memory
+    """
+    url = urlsplit(server_url)
+    host = url.hostname or "127.0.0.1"
+    server = WoppServer((host, url.port or 80), client, ttl=ttl)
+    click.echo(f"Serving on http://{host}:{server.server_port}, press Ctrl+C to stop", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,156 @@
+"""
+Per-stage timings of lookups, for `--timings` and `WoppClient(timing_hook=...)`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import functools
+import json
+import threading
+import time
+from typing import Any, TypeVar
+
+import click
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class RequestTimings:
+    """
+    Where the time went in one `WoppClient` request.
+
+    Stages are in seconds:
+
+    - `cache`: looking up the on-disk cache
+    - `throttle`: waiting for the rate limiter, including any Retry-After pauses
+    - `request`: connecting (DNS, TLS), sending the request, any retries, and
+      waiting for the response headers
+    - `parse`: downloading and parsing the body, which overlap when it is streamed
+    - `clean`: picking out the fields we use from the parsed document
+    - `wait`: waiting on an identical request already in flight, whose response is shared
+    """
+
+    def __init__(self, package: str, version: str | None, url: str) -> None:
+        self.package: str = package
+        self.version: str | None = version
+        self.url: str = url
+        # "hit", "revalidated", "miss", "off" without a cache, "memory" for a hit in
+        # the in-memory cache, or "shared" when the response of an identical request
+        # in flight was used
+        self.cache: str = "off"
+        self.status_code: int | None = None
+        self.bytes_received: int = 0
+        self.retries: int = 0
+        self.stages: dict[str, float] = {}
+        self.started: float = time.perf_counter()
+        self.elapsed: float = 0.0
+
+    def finish(self) -> RequestTimings:
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "package": self.package,
+            "version": self.version,
+            "url": self.url,
+            "cache": self.cache,
+            "status_code": self.status_code,
+            "bytes": self.bytes_received,
+            "retries": self.retries,
+            "stages_ms": {name: round(s * 1000, 3) for name, s in self.stages.items()},
+            "elapsed_ms": round(self.elapsed * 1000, 3),
+        }
+
+
+class TimingsReport:
+    """
+    Collects the timings of a whole run: every request, plus stages like rendering.
+
+    Pass `add` as the client's `timing_hook`; it is safe to call from worker threads.
+    """
+
+    def __init__(self) -> None:
+        self.requests: list[RequestTimings] = []
+        self.stages: dict[str, float] = {}
+        self.started: float = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, timings: RequestTimings) -> None:
+        with self._lock:
+            self.requests.append(timings)
+
+    def timed(self, stage: str, func: F) -> F:
+        """
+        Wraps `func` so that the time spent in it is added to `stage`.
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.stages[stage] = self.stages.get(stage, 0.0) + (time.perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requests": [timings.to_dict() for timings in self.requests],
+            "stages_ms": {name: round(s * 1000, 3) for name, s in self.stages.items()},
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+        }
+
+    def format(self) -> str:
+        """
+        Returns the report as human-readable lines.
+        """
+        report = self.to_dict()
+        lines = ["Timings:"]
+        for request in report["requests"]:
+            name = request["package"]
+            if request["version"]:
+                name += f"=={request['version']}"
+            lines.append(
+                f"  {name}: {request['elapsed_ms']:.1f} ms, cache {request['cache']},"
+                f" status {request['status_code']}, {request['bytes'] / 1024:.1f} KB,"
+                f" {request['retries']} retries"
+            )
+            stages = ", ".join(f"{k} {v:.1f} ms" for k, v in request["stages_ms"].items())
+            if stages:
+                lines.append(f"    {stages}")
+        for stage, ms in report["stages_ms"].items():
+            lines.append(f"  {stage}: {ms:.1f} ms")
+        lines.append(f"  total: {report['total_ms']:.1f} ms")
+        return "\n".join(lines)
+
+    def echo(self, output_format: str = "text") -> None:
+        """
+        Writes the report to stderr, as text or as a single line of JSON.
+        """
+        if output_format == "json":
+            click.echo(json.dumps(self.to_dict()), err=True)
+        else:
+            click.echo(self.format(), err=True)
+
+
+def bytes_received(response: Any) -> int:
+    """
+    Returns how many body bytes came in for a response, as sent (i.e. compressed).
+    """
+    raw = getattr(response, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        return int(raw.tell())
+    content = getattr(response, "_content", None)
+    return len(content) if isinstance(content, bytes) else 0
+
+
+def retry_count(response: Any) -> int:
+    """
+    Returns how many times urllib3 retried before this response.
+    """
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    return len(getattr(retries, "history", None) or ())
@@ -0,0 +1,218 @@
+"""
+Transports that carry `WoppClient` requests to a package index, or stand in for one.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Mapping
+from typing import Optional
+
+from requests import Request, Response, Session
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+from .constants import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_POOL_SIZE,
+    PYPI_BASE_URL,
+)
+from .offline import OfflineIndex
+
+# (status code, body) answered by a `CallableTransport` handler
+HandlerResult = tuple[int, Optional[bytes]]
+Handler = Callable[[str, Mapping[str, str]], HandlerResult]
+
+
+def make_response(url: str, status_code: int, body: bytes | None = None) -> Response:
+    """
+    Returns a `requests.Response` for a JSON document that didn't come over the network.
+
+    :param url: URL the document answers
+    :param status_code: HTTP status code
+    :param body: JSON bytes, if any
+    :return: Response object with its body already read
+    """
+    response = Response()
+    response.status_code = status_code
+    response.url = url
+    response.encoding = "utf-8"
+    response.headers["Content-Type"] = "application/json"
+    response._content = body or b""
+    response._content_consumed = True  # type: ignore[attr-defined]
+    return response
+
+
+def drain_response(response: Response) -> None:
+    """
+    Reads the rest of a streamed body that was left unread, e.g. by a response hook
+    that only wanted the start of a document.
+
+    Closing a response with unread body closes its connection; draining it first
+    lets the connection go back to the pool for the next request instead.
+    """
+    if getattr(response, "_content_consumed", True) is False and response.raw is not None:
+        response.raw.drain_conn()
+
+
+class Transport(ABC):
+    """
+    Sends GET requests for `WoppClient` and returns the responses.
+
+    Response hooks are run by the client, so a transport only has to produce a
+    `requests.Response`. The body may be left unread for the hooks to stream.
+    """
+
+    @abstractmethod
+    def send(self, url: str, headers: Mapping[str, str], timeout: float) -> Response:
+        """
+        Sends a GET request.
+
+        :param url: URL to fetch
+        :param headers: Request headers
+        :param timeout: Request timeout in seconds
+        :return: Response object
+        :raises requests.RequestException: if the index couldn't be reached
+        """
+
+    def with_retries(self, max_retries: int) -> Transport:
+        """
+        Returns a transport that retries failed requests `max_retries` times.
+        The caller closes it if it isn't this transport.
+        """
+        return self
+
+    def close(self) -> None:  # noqa: B027 - optional, most transports hold nothing
+        """
+        Releases any resources held by the transport.
+        """
+
+
+class RequestsTransport(Transport):
+    """
+    Talks HTTP through a `requests.Session` with a pooling, retrying adapter.
+    """
+
+    def __init__(
+        self,
+        pool_connections: bool = True,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        retries: int | Retry = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """
+        :param pool_connections: Keep one session, and its connection pool, for all requests
+        :param pool_size: Number of per-host connection pools to keep
+        :param pool_maxsize: Connections kept alive per host; keep it >= the batch concurrency
+        :param retries: Retry attempts for failed requests, or a urllib3 `Retry` policy
+            (429s are taken out of it; the client's rate limiter retries those)
+        """
+        self.pool_size: int = pool_size
+        self.pool_maxsize: int = pool_maxsize
+        policy = retries if isinstance(retries, Retry) else self._make_retry(retries)
+        self.retries: Retry = self._without_throttling(policy)
+        self.session: Session | None = self._new_session() if pool_connections else None
+
+    @staticmethod
+    def _make_retry(max_retries: int) -> Retry:
+        return Retry(
+            total=max_retries,
+            backoff_factor=0.1,
+            status_forcelist=[500, 502, 503, 504],
+        )
+
+    @staticmethod
+    def _without_throttling(policy: Retry) -> Retry:
+        """
+        Returns `policy` minus its handling of 429s. The client's rate limiter retries
+        those; left to urllib3, they would be retried, and Retry-After slept on, out of
+        the limiter's sight, multiplying the requests sent while throttled.
+        """
+        forcelist = policy.status_forcelist
+        if forcelist and 429 in forcelist:
+            forcelist = [status for status in forcelist if status != 429]
+        return policy.new(respect_retry_after_header=False, status_forcelist=forcelist)
+
+    def _new_session(self) -> Session:
+        """
+        Returns a session with a connection-pooling adapter mounted for `self.retries`.
+        """
+        session = Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.retries,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def send(self, url: str, headers: Mapping[str, str], timeout: float) -> Response:
+        session = self.session or self._new_session()
+        try:
+            prepared_request = session.prepare_request(
+                Request(method="GET", url=url, headers=dict(headers))
+            )
+            # with a shared session, the body is left unread so that response hooks can
+            # parse it as it streams in; a throwaway session is closed before they run
+            return session.send(
+                prepared_request,
+                timeout=timeout,
+                allow_redirects=True,
+                stream=session is self.session,
+            )
+        finally:
+            if session is not self.session:
+                session.close()
+
+    def with_retries(self, max_retries: int) -> RequestsTransport:
+        return RequestsTransport(
+            pool_size=self.pool_size,
+            pool_maxsize=self.pool_maxsize,
+            retries=max_retries,
+        )
+
+    def close(self) -> None:
+        if self.session:
+            self.session.close()
+
+
+class OfflineTransport(Transport):
+    """
+    Answers requests from an `OfflineIndex`, without any network I/O.
+    """
+
+    def __init__(self, index: OfflineIndex, base_url: str = PYPI_BASE_URL) -> None:
+        """
+        :param index: Local mirror or snapshot to answer from
+        :param base_url: Index URL the client builds its request URLs from
+        """
+        self.index: OfflineIndex = index
+        self.base_url: str = base_url.rstrip("/")
+
+    def send(self, url: str, headers: Mapping[str, str], timeout: float) -> Response:
+        parts = url[len(self.base_url) :].strip("/").split("/")
+        body = None
+        if url.startswith(self.base_url) and parts[-1] == "json" and len(parts) in (2, 3):
+            body = self.index.get(parts[0], parts[1] if len(parts) == 3 else None)
+        return make_response(url, 200 if body is not None else 404, body)
+
+
+class CallableTransport(Transport):
+    """
+    Answers requests with a function, e.g. an in-process stand-in for an index in load tests.
+
+    The handler is called with the URL and headers, and returns a status code and
+    JSON body: `handler(url, headers) -> (200, b'{"info": ...}')`.
+    """
+
+    def __init__(self, handler: Handler) -> None:
+        """
+        :param handler: Function answering each request
+        """
+        self.handler: Handler = handler
+
+    def send(self, url: str, headers: Mapping[str, str], timeout: float) -> Response:
+        status_code, body = self.handler(url, headers)
+        return make_response(url, status_code, body)
@@ -0,0 +1,233 @@
+"""
+Transitive dependency trees, expanded breadth-first from `requires_dist`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+import time
+from typing import Any
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.utils import canonicalize_name
+
+from .client import WoppClient, WoppResponse
+from .exceptions import WoppError
+from .whatsonpypi import make_client
+
+# (canonical name, extras) of a node; the same package with other extras is another node
+NodeKey = tuple[str, frozenset[str]]
+
+
+class DependencyNode:
+    """
+    A package in a dependency tree, with the requirements it was reached by.
+    """
+
+    def __init__(self, name: str, extras: frozenset[str], depth: int) -> None:
+        self.name: str = name
+        self.extras: frozenset[str] = extras
+        # shallowest level the node was reached at
+        self.depth: int = depth
+        self.version: str = ""
+        self.error: WoppError | None = None
+        # (requirement, child) for each dependency that applies
+        self.children: list[tuple[Requirement, NodeKey]] = []
+
+    @property
+    def label(self) -> str:
+        extras = f"[{','.join(sorted(self.extras))}]" if self.extras else ""
+        return f"{self.name}{extras}"
+
+
+class DependencyTree:
+    """
+    The result of `resolve_tree`: every node reached, plus how it was resolved.
+
+    Each dependency is shown at the latest version on the index; this is not a resolver,
+    so whether that version satisfies the requirement is reported rather than enforced.
+    """
+
+    def __init__(self, roots: list[NodeKey]) -> None:
+        self.roots: list[NodeKey] = roots
+        self.nodes: dict[NodeKey, DependencyNode] = {}
+        # levels expanded, and packages looked up
+        self.depth: int = 0
+        self.lookups: int = 0
+        self.elapsed: float = 0.0
+
+    def iter_edges(self) -> Iterator[dict[str, Any]]:
+        """
+        Yields one record per dependency edge, breadth-first, e.g. for `--format`.
+        """
+        for node in sorted(self.nodes.values(), key=lambda n: n.depth):
+            if node.error is not None:
+                yield {"package": node.label, "depth": node.depth, "error": str(node.error)}
+            for requirement, key in node.children:
+                child = self.nodes[key]
+                yield {
+                    "package": node.label,
+                    "version": node.version,
+                    "depth": node.depth + 1,
+                    "dependency": child.label,
+                    "requirement": str(requirement.specifier),
+                    "marker": str(requirement.marker) if requirement.marker else "",
+                    "latest": child.version,
+                    "satisfied": satisfies(requirement, child.version),
+                }
+
+    def format(self) -> str:
+        """
+        Returns the tree as indented text. Packages already shown are marked with (*)
+        and not expanded again.
+        """
+        lines: list[str] = []
+        shown: set[NodeKey] = set()
+        for key in self.roots:
+            node = self.nodes[key]
+            lines.append(f"{node.label} {node.version or '(not found)'}")
+            shown.add(key)
+            self._format_children(node, "", shown, lines)
+        return "\n".join(lines)
+
+    def _format_children(
+        self, node: DependencyNode, prefix: str, shown: set[NodeKey], lines: list[str]
+    ) -> None:
+        for i, (requirement, key) in enumerate(node.children):
+            last = i == len(node.children) - 1
+            child = self.nodes[key]
+            spec = str(requirement.specifier) or "any"
+            if child.error is not None:
+                status = "not found"
+            else:
+                status = child.version
+                if not satisfies(requirement, child.version):
+                    status += ", excluded"
+            repeated = key in shown
+            lines.append(
+                f"{prefix}{'└── ' if last else '├── '}{child.label} {spec} ({status})"
+                + (" (*)" if repeated and child.children else "")
+            )
+            if not repeated:
+                shown.add(key)
+                self._format_children(child, prefix + ("    " if last else "│   "), shown, lines)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.nodes)} packages, depth {self.depth},"
+            f" {self.lookups} lookups in {self.elapsed:.2f} s"
+        )
+
+
+def satisfies(requirement: Requirement, version: str) -> bool:
+    """
+    Does `version` meet the specifier of `requirement`? Pre-releases count.
+    """
+    if not version:
+        return False
+    try:
+        return requirement.specifier.contains(version, prereleases=True)
+    except ValueError:
+        return False
+
+
+def iter_requirements(
+    requires_dist: Iterable[str],
+    extras: frozenset[str],
+    environment: Mapping[str, str] | None = None,
+) -> Iterator[Requirement]:
+    """
+    Yields the requirements that apply, given the extras asked for and the environment.
+
+    :param requires_dist: requirement strings from a package's metadata
+    :param extras: extras the package was asked for with
+    :param environment: marker variables to override; defaults to the running interpreter
+    """
+    for line in requires_dist:
+        try:
+            requirement = Requirement(line)
+        except InvalidRequirement:
+            continue
+        if requirement.marker is None:
+            yield requirement
+            continue
+        # a requirement of an extra has `extra == "..."` in its marker
+        for extra in sorted(extras) or [""]:
+            if requirement.marker.evaluate({**(environment or {}), "extra": extra}):
+                yield requirement
+                break
+
+
+def resolve_tree(
+    packages: Sequence[tuple[str, str | None]],
+    client: WoppClient | None = None,
+    max_depth: int | None = None,
+    environment: Mapping[str, str] | None = None,
+) -> DependencyTree:
+    """
+    Expands the dependencies of packages breadth-first, looking up each level concurrently.
+
+    Every package is looked up once, whatever the extras or the number of packages
+    depending on it. Pinned roots are looked up at their version, everything else at
+    the latest version.
+
+    :param packages: (requirement, version) of each root, e.g. ("requests[socks]", None)
+    :param client: client to query with, see `make_client`
+    :param max_depth: levels of dependencies to expand; all of them if None
+    :param environment: marker variables to override, e.g. {"python_version": "3.9"}
+    :return: DependencyTree
+    """
+    client = client or make_client()
+    started = time.perf_counter()
+
+    roots: list[NodeKey] = []
+    versions: dict[str, str | None] = {}
+    for spec, version in packages:
+        name: str
+        try:
+            requirement = Requirement(spec)
+            name, extras = canonicalize_name(requirement.name), frozenset(requirement.extras)
+        except InvalidRequirement:
+            name, extras = canonicalize_name(spec), frozenset()
+        roots.append((name, extras))
+        versions[name] = version
+
+    tree = DependencyTree(list(dict.fromkeys(roots)))
+    for name, extras in roots:
+        tree.nodes.setdefault((name, extras), DependencyNode(name, extras, 0))
+
+    responses: dict[str, WoppResponse | WoppError] = {}
+    level = tree.roots
+    depth = 0
+    while level:
+        wanted = list(dict.fromkeys(name for name, _ in level if name not in responses))
+        lookups = client.iter_many(
+            [(name, versions.get(name)) for name in wanted], sections={"info"}
+        )
+        for index, result in lookups:
+            responses[wanted[index]] = result
+        tree.lookups += len(wanted)
+
+        next_level: list[NodeKey] = []
+        for key in level:
+            node = tree.nodes[key]
+            response = responses[node.name]
+            if isinstance(response, WoppError):
+                node.error = response
+                continue
+            node.version = response.latest_version
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for requirement in iter_requirements(response.dependencies, node.extras, environment):
+                child_key = (canonicalize_name(requirement.name), frozenset(requirement.extras))
+                node.children.append((requirement, child_key))
+                if child_key not in tree.nodes:
+                    tree.nodes[child_key] = DependencyNode(*child_key, depth + 1)
+                    next_level.append(child_key)
+        if next_level:
+            depth += 1
+        level = next_level
+
+    tree.depth = depth
+    tree.elapsed = time.perf_counter() - started
+    return tree
@@ -1,38 +1,62 @@
 from __future__ import annotations
 
+from collections.abc import Collection, Iterator
 from datetime import datetime
-import re
-from typing import Any
+import importlib.util
+import time
+from typing import TYPE_CHECKING, Any
 
 import click
+from packaging.requirements import InvalidRequirement, Requirement
+from requests.exceptions import RequestException
+from requests.packages.urllib3.exceptions import HTTPError
+
+from .constants import PROJECT_SECTIONS
 
 try:
-    from rich import box
-    from rich.console import Console
-    from rich.panel import Panel
-    from rich.table import Table
+    import ijson
 
-    _HAS_RICH: bool = True
+    _HAS_IJSON: bool = True
 except ImportError:
-    _HAS_RICH = False
+    _HAS_IJSON = False
+
+# what reading or parsing a response body in `clean_response` can raise: a body cut
+# short shows up as a urllib3 error when it is streamed, malformed JSON as a ValueError
+BODY_ERRORS: tuple[type[Exception], ...] = (RequestException, HTTPError, ValueError) + (
+    (ijson.JSONError,) if _HAS_IJSON else ()
+)
+
+# rich takes a while to import, so it is only imported once there is output to render
+_HAS_RICH: bool = importlib.util.find_spec("rich") is not None
 
-from .constants import REQ_LINE_REGEX
+if TYPE_CHECKING:
+    from rich.table import Table
 
 
 def parse_pkg_string(in_str: str) -> tuple[str | None, str | None, str | None]:
     """
-    Extract package name and pinned version from a string using the '==' specifier.
+    Extract package name and version specifier from a requirement string.
 
-    Only supports 'package==version' format. If no version is given, returns the package name alone.
+    A single exact pin ('package==version') is returned as the version, anything else
+    (e.g. 'package>=4.2,<5' or 'package==4.*') as the specifier.
+    If no version is given, returns the package name alone.
 
-    :param in_str: Raw input string (e.g. 'requests==2.31.0' or 'requests')
-    :return: A tuple of (package name, version, specifier), or (name, None, None) if not matched
+    :param in_str: Raw input string (e.g. 'requests==2.31.0', 'django>=4.2,<5' or 'requests')
+    :return: A tuple of (package name, version, specifier):
+        (name, version, '==') for an exact pin, (name, None, specifier) for a range,
+        or (name, None, None) if no version was given or the string was not understood
     """
-    match = re.match(REQ_LINE_REGEX, in_str.strip())
-    if match:
-        groups = match.groupdict()
-        return groups["package"], groups["version"], "=="
-    return in_str.strip(), None, None
+    try:
+        requirement = Requirement(in_str.strip())
+    except InvalidRequirement:
+        return in_str.strip(), None, None
+
+    specs = list(requirement.specifier)
+    if not specs:
+        return requirement.name, None, None
+    if len(specs) == 1 and specs[0].operator == "==" and not specs[0].version.endswith(".*"):
+        return requirement.name, specs[0].version, "=="
+    return requirement.name, None, str(requirement.specifier)
 
 
 def format_key(key_: str) -> str:
@@ -61,6 +85,10 @@ def pretty(data: dict[str, Any], indent: int = 0) -> None:
     """
 
     if _HAS_RICH:
+        from rich import box
+        from rich.console import Console
+        from rich.panel import Panel
+        from rich.table import Table
 
         def render_table(input_dict: dict[str, Any]) -> Table:
             table = Table(
@@ -118,6 +146,44 @@ def pretty(data: dict[str, Any], indent: int = 0) -> None:
                 click.echo("\t" * (indent + 1) + format_value(value))
 
 
+def pretty_table(rows: list[dict[str, Any]], title: str = "📦 PyPI Package Info") -> None:
+    """
+    Pretty print rows of the same shape as a single table with a header.
+
+    If `rich` is installed, renders a stylized table.
+    Otherwise falls back to plain click-based aligned columns.
+
+    :param rows: Dictionaries to print, one per row. Keys of the first row are the columns.
+    :param title: Table title
+    """
+    if not rows:
+        return
+    columns = list(rows[0])
+
+    if _HAS_RICH:
+        from rich import box
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title=title, title_justify="left", box=box.ROUNDED, padding=(0, 1))
+        for column in columns:
+            table.add_column(format_key(column), style="white", header_style="bold magenta")
+        for row in rows:
+            table.add_row(*(format_value(row.get(column) or "") for column in columns))
+        Console().print(table)
+    else:
+        cells = [[format_value(row.get(column) or "") for column in columns] for row in rows]
+        widths = [
+            max(len(format_key(column)), *(len(line[i]) for line in cells))
+            for i, column in enumerate(columns)
+        ]
+        click.secho(f"{title}\n", fg="yellow", bold=True)
+        header = "  ".join(format_key(c).ljust(w) for c, w in zip(columns, widths))
+        click.secho(header.rstrip(), fg="green", bold=True)
+        for line in cells:
+            click.echo("  ".join(cell.ljust(w) for cell, w in zip(line, widths)).rstrip())
+
+
 def get_human_size(size_bytes: float) -> str | None:
     if size_bytes < 0:
         return None
@@ -128,83 +194,315 @@ def get_human_size(size_bytes: float) -> str | None:
     return f"{size_bytes:.2f} TB"
 
 
-def filter_release_info(pkg_url_list: list[dict[str, Any]]) -> dict[str, Any | None]:
+def select_release_file(pkg_url_list: list[dict[str, Any]]) -> dict[str, Any] | None:
     """
-    Converts a list of package info dicts into a dict.
+    Picks the file that represents a release: the last wheel, else the first artifact.
+    """
+    selected = None
+    for pkg in pkg_url_list:
+        package_type = pkg.get("packagetype", "").lower()
+        if "wheel" in package_type:
+            selected = pkg
+        elif selected is None:
+            # for other types, just use the first one found
+            selected = pkg
+    return selected
+
+
+def release_file_info(pkg: dict[str, Any]) -> dict[str, Any | None]:
+    """
+    Converts a package file info dict into the fields we display.
+    """
+    return {
+        "filename": pkg.get("filename"),
+        "size": get_human_size(float(pkg.get("size", 0))),
+        "upload_time": pkg.get("upload_time_iso_8601"),
+        "requires_python": pkg.get("requires_python"),
+        "url": pkg.get("url"),
+        "yanked": pkg.get("yanked"),
+        "md5": pkg.get("digests", {}).get("md5"),
+    }
+
+
+def artifact_info(pkg: dict[str, Any]) -> dict[str, Any]:
+    """
+    Converts a package file info dict into everything we keep about an artifact,
+    including its full digests.
+    """
+    digests = pkg.get("digests") or {}
+    return {
+        "filename": pkg.get("filename"),
+        "packagetype": pkg.get("packagetype"),
+        "python_version": pkg.get("python_version"),
+        "size": int(pkg.get("size") or 0),
+        "upload_time": pkg.get("upload_time_iso_8601"),
+        "requires_python": pkg.get("requires_python"),
+        "yanked": bool(pkg.get("yanked")),
+        "yanked_reason": pkg.get("yanked_reason"),
+        "url": pkg.get("url"),
+        "sha256": digests.get("sha256"),
+        "blake2b_256": digests.get("blake2b_256"),
+        "md5": digests.get("md5") or pkg.get("md5_digest"),
+    }
+
+
+class ReleaseRecord:
+    """
+    Compact record of the file that represents a release.
+
+    The upload time is parsed once and the size kept as an integer, so sorting and
+    formatting never go back to strings. In the cleaned response each record is
+    stored as a plain row (see `to_row`) to keep the document small.
     """
 
-    def _get_info(pkg_: dict[str, Any]) -> dict[str, Any | None]:
+    __slots__ = (
+        "filename",
+        "md5",
+        "requires_python",
+        "size",
+        "upload_time",
+        "upload_time_iso_8601",
+        "url",
+        "version",
+        "yanked",
+    )
+
+    def __init__(
+        self,
+        version: str,
+        filename: str | None = None,
+        size: int = 0,
+        upload_time: datetime | None = None,
+        requires_python: str | None = None,
+        url: str | None = None,
+        yanked: bool = False,
+        md5: str | None = None,
+        upload_time_iso_8601: str | None = None,
+    ) -> None:
+        self.version: str = version
+        self.filename: str | None = filename
+        self.size: int = size
+        self.upload_time: datetime | None = upload_time
+        self.requires_python: str | None = requires_python
+        self.url: str | None = url
+        self.yanked: bool = yanked
+        self.md5: str | None = md5
+        # as PyPI wrote it, so that displayed records match `release_file_info`
+        self.upload_time_iso_8601: str | None = upload_time_iso_8601
+
+    @staticmethod
+    def to_row(pkg: dict[str, Any]) -> list[Any]:
+        """
+        Converts a raw package file info dict into a compact row.
+        """
+        return [
+            pkg.get("filename"),
+            int(pkg.get("size") or 0),
+            pkg.get("upload_time_iso_8601"),
+            pkg.get("requires_python"),
+            pkg.get("url"),
+            bool(pkg.get("yanked")),
+            (pkg.get("digests") or {}).get("md5"),
+        ]
+
+    @classmethod
+    def from_row(cls, version: str, row: list[Any]) -> ReleaseRecord:
+        """
+        Builds a record from a row made by `to_row`.
+        """
+        filename, size, upload_time, requires_python, url, yanked, md5 = row
+        upload_dt = None
+        if isinstance(upload_time, str):
+            try:
+                upload_dt = datetime.fromisoformat(upload_time.replace("Z", "+00:00"))
+            except ValueError:
+                upload_dt = None
+        return cls(
+            version, filename, size, upload_dt, requires_python, url, yanked, md5, upload_time
+        )
+
+    @property
+    def human_size(self) -> str | None:
+        return get_human_size(float(self.size))
+
+    def to_dict(self) -> dict[str, Any | None]:
+        """
+        Returns the fields we display, in the same shape as `release_file_info`.
+        """
         return {
-            "filename": pkg_.get("filename"),
-            "size": get_human_size(float(pkg_.get("size", 0))),
-            "upload_time": pkg_.get("upload_time_iso_8601"),
-            "requires_python": pkg_.get("requires_python"),
-            "url": pkg_.get("url"),
-            "yanked": pkg_.get("yanked"),
-            "md5": pkg_.get("digests", {}).get("md5"),
+            "filename": self.filename,
+            "size": self.human_size,
+            "upload_time": self.upload_time_iso_8601,
+            "requires_python": self.requires_python,
+            "url": self.url,
+            "yanked": self.yanked,
+            "md5": self.md5,
         }
 
-    info = {}
-    for pkg in pkg_url_list:
-        package_type = pkg.get("packagetype", "").lower()
-        if "wheel" in package_type:
-            info = _get_info(pkg)
+
+def filter_release_info(pkg_url_list: list[dict[str, Any]]) -> dict[str, Any | None]:
+    """
+    Converts a list of package info dicts into a dict.
+    """
+    pkg = select_release_file(pkg_url_list)
+    return release_file_info(pkg) if pkg else {}
+
+
+def iter_project_sections(
+    stream: Any,
+    sections: Collection[str] = PROJECT_SECTIONS,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Incrementally parse a PyPI project document, yielding only the parts we use.
+
+    Yields ("info", dict), ("release", (version, file list)) once per release, and
+    ("urls", list), in document order. Everything else is skipped as it streams past,
+    so the full `releases` tree is never held in memory at once.
+
+    :param stream: file-like object with a `read` method returning JSON bytes
+    :param sections: top-level sections to yield; parsing stops once all of them are read
+    :return: iterator of (section, value) pairs
+    """
+    wanted = set(sections)
+    builder: Any = None
+    section = ""
+    depth = 0
+    release_version: str | None = None
+
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            if depth == 0:
+                built = builder.value
+                yield section, (release_version, built) if section == "release" else built
+                builder = None
+                wanted.discard(section)
+                if not wanted:
+                    return
+            continue
+
+        if prefix == "releases":
+            if event == "map_key":
+                release_version = value
+            elif event == "end_map":
+                wanted.discard("releases")
+                if not wanted:
+                    return
+            continue
+
+        if event == "start_map" and prefix == "info" and "info" in wanted:
+            section = "info"
+        elif event == "start_array" and prefix == "urls" and "urls" in wanted:
+            section = "urls"
+        elif (
+            event == "start_array"
+            and prefix == f"releases.{release_version}"
+            and "releases" in wanted
+        ):
+            section = "release"
         else:
-            # for other types, just use the first one found
-            if not info:
-                info = _get_info(pkg)
+            continue
 
-    return info
+        builder = ijson.common.ObjectBuilder()
+        builder.event(event, value)
+        depth = 1
 
 
-def clean_response(r: Any, *_args: Any, **_kwargs: Any) -> Any:
+def _iter_sections(r: Any, sections: Collection[str]) -> Iterator[tuple[str, Any]]:
+    """
+    Yields the wanted sections of a response body, streaming them when possible.
+    """
+    raw = getattr(r, "raw", None)
+    # requests leaves the body unread when the request was sent with stream=True
+    if _HAS_IJSON and raw is not None and getattr(r, "_content_consumed", True) is False:
+        raw.decode_content = True
+        yield from iter_project_sections(raw, sections)
+        return
+
+    dirty = r.json()
+    if "info" in dirty and "info" in sections:
+        yield "info", dirty["info"]
+    if "releases" in sections:
+        for release in (dirty.get("releases") or {}).items():
+            yield "release", release
+    if "urls" in dirty and "urls" in sections:
+        yield "urls", dirty["urls"]
+
+
+def clean_response(
+    r: Any,
+    *_args: Any,
+    sections: Collection[str] | None = None,
+    **_kwargs: Any,
+) -> Any:
     """
     Hook called after a response is received.
     Used to modify response.
 
+    If `ijson` is installed and the body has not been read yet, it is parsed as it
+    streams in. Otherwise the whole body is loaded with `r.json()`.
+    Seconds spent parsing and cleaning are left in `r.clean_timings`.
+
     :param r: requests.models.Response object
+    :param sections: top-level sections of the document to clean, e.g. only "info"
+        when the releases aren't needed. Defaults to all of them.
     :return: modified Response object
     """
     if r.status_code != 200:
         return r
 
-    dirty = r.json()
-    clean = {}
-
-    info = dirty.get("info")
-    if info:
-        clean = {
-            "name": info.get("name"),
-            "latest_version": info.get("version"),
-            "summary": info.get("summary"),
-            "homepage": info.get("home_page"),
-            "package_url": info.get("project_url") or info.get("package_url"),
-            "author": info.get("author") or info.get("author_email"),
-            "project_urls": info.get("project_urls"),
-            "requires_python": info.get("requires_python"),
-            "license": info.get("license"),
-            "latest_release_url": info.get("release_url"),
-            "dependencies": info.get("requires_dist"),
-        }
-
-    releases = dirty.get("releases")
-    if releases:
-        release_list = list(releases.keys())
-        release_info = {}
-        for release_version, file_info_list in releases.items():
-            if not file_info_list:
-                continue
-            release_info[release_version] = filter_release_info(file_info_list)
+    clean: dict[str, Any] = {}
+    release_list = []
+    release_files = {}
+    started = time.perf_counter()
+    # time spent outside the parser; the rest is reading and parsing the body
+    clean_seconds = 0.0
+
+    for section, value in _iter_sections(r, PROJECT_SECTIONS if sections is None else sections):
+        section_started = time.perf_counter()
+        if section == "info" and value:
+            clean.update(
+                {
+                    "name": value.get("name"),
+                    "latest_version": value.get("version"),
+                    "summary": value.get("summary"),
+                    "homepage": value.get("home_page"),
+                    "package_url": value.get("project_url") or value.get("package_url"),
+                    "author": value.get("author") or value.get("author_email"),
+                    "project_urls": value.get("project_urls"),
+                    "requires_python": value.get("requires_python"),
+                    "license": value.get("license"),
+                    "latest_release_url": value.get("release_url"),
+                    "dependencies": value.get("requires_dist"),
+                }
+            )
+        elif section == "release":
+            release_version, file_info_list = value
+            release_list.append(release_version)
+            # keep a compact row; WoppResponse builds the release info when it's asked for
+            release_file = select_release_file(file_info_list or [])
+            if release_file:
+                release_files[release_version] = ReleaseRecord.to_row(release_file)
+        elif section == "urls" and value:
+            clean["latest_pkg_urls"] = filter_release_info(value)
+            clean["files"] = [artifact_info(pkg) for pkg in value]
+        clean_seconds += time.perf_counter() - section_started
+
+    if release_list:
         clean.update(
             {
                 "releases": release_list,
-                "release_info": release_info,
+                "release_files": release_files,
             }
         )
 
-    urls = dirty.get("urls")
-    if urls:
-        clean["latest_pkg_urls"] = filter_release_info(urls)
-
     r.cleaned_json = clean
+    r.clean_timings = {
+        "parse": time.perf_counter() - started - clean_seconds,
+        "clean": clean_seconds,
+    }
     return r
@@ -0,0 +1,152 @@
+"""
+PEP 440 aware ordering and lookups over a package's releases.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Container, Iterable, Iterator
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import InvalidVersion, Version
+
+
+def _next_prefix(prefix: str) -> Version:
+    """
+    Returns the smallest version that sorts after every version starting with `prefix`.
+
+    E.g. "4.2" -> 4.3.dev0, so that [4.2.dev0, 4.3.dev0) holds all of 4.2.*
+    """
+    version = Version(prefix)
+    release = (*version.release[:-1], version.release[-1] + 1)
+    epoch = f"{version.epoch}!" if version.epoch else ""
+    return Version(f"{epoch}{'.'.join(map(str, release))}.dev0")
+
+
+def _prefix_start(prefix: str) -> Version:
+    """
+    Returns the smallest version starting with `prefix`.
+    """
+    return Version(f"{prefix}.dev0")
+
+
+class VersionIndex:
+    """
+    Releases of a package sorted by PEP 440 ordering, with pre-release and yanked flags.
+
+    Specifier queries narrow the candidates down with binary searches on the bounds
+    the specifier implies, and only check the versions in between one by one.
+    Release strings that are not valid PEP 440 versions are kept in `invalid`.
+    """
+
+    def __init__(self, releases: Iterable[str], yanked: Container[str] = ()) -> None:
+        parsed: list[tuple[Version, str]] = []
+        self.invalid: list[str] = []
+        for release in releases:
+            try:
+                parsed.append((Version(release), release))
+            except InvalidVersion:
+                self.invalid.append(release)
+        parsed.sort()
+
+        self.versions: list[Version] = [version for version, _ in parsed]
+        self.releases: list[str] = [release for _, release in parsed]
+        self.yanked: list[bool] = [release in yanked for release in self.releases]
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def _upper(self, version: Version) -> int:
+        """
+        Returns the index just past `version` and, unless it has a local part of its own,
+        every local variant of it: '==1.0' and '<=1.0' match 1.0+local, which sorts after 1.0.
+        """
+        hi = bisect_right(self.versions, version)
+        if version.local is None:
+            while hi < len(self.versions) and Version(self.versions[hi].public) == version:
+                hi += 1
+        return hi
+
+    def _bounds(self, specifier: SpecifierSet) -> tuple[int, int]:
+        """
+        Returns the [lo, hi) slice of `versions` that can possibly match `specifier`.
+        """
+        lo, hi = 0, len(self.versions)
+        for spec in specifier:
+            operator, target = spec.operator, spec.version
+            try:
+                if target.endswith(".*"):
+                    prefix = target[:-2]
+                    if operator == "==":
+                        lo = max(lo, bisect_left(self.versions, _prefix_start(prefix)))
+                        hi = min(hi, bisect_left(self.versions, _next_prefix(prefix)))
+                    continue
+                version = Version(target)
+            except InvalidVersion:
+                continue
+
+            if operator == ">=":
+                lo = max(lo, bisect_left(self.versions, version))
+            elif operator == ">":
+                lo = max(lo, bisect_right(self.versions, version))
+            elif operator == "<=":
+                hi = min(hi, self._upper(version))
+            elif operator == "<":
+                hi = min(hi, bisect_left(self.versions, version))
+            elif operator == "==":
+                lo = max(lo, bisect_left(self.versions, version))
+                hi = min(hi, self._upper(version))
+            elif operator == "~=":
+                lo = max(lo, bisect_left(self.versions, version))
+                prefix = ".".join(map(str, version.release[:-1]))
+                if version.epoch:
+                    prefix = f"{version.epoch}!{prefix}"
+                hi = min(hi, bisect_left(self.versions, _next_prefix(prefix)))
+        return lo, max(lo, hi)
+
+    def _iter_matches(
+        self,
+        specifier: str | SpecifierSet,
+        prereleases: bool | None,
+        include_yanked: bool,
+    ) -> Iterator[str]:
+        spec = specifier if isinstance(specifier, SpecifierSet) else SpecifierSet(specifier)
+        if prereleases is None:
+            # spelled out, since packaging's own default differs between releases
+            prereleases = bool(spec.prereleases)
+        lo, hi = self._bounds(spec)
+        for i in range(hi - 1, lo - 1, -1):
+            if not include_yanked and self.yanked[i]:
+                continue
+            if spec.contains(self.versions[i], prereleases=prereleases):
+                yield self.releases[i]
+
+    def filter(
+        self,
+        specifier: str | SpecifierSet = "",
+        prereleases: bool | None = None,
+        include_yanked: bool = True,
+    ) -> list[str]:
+        """
+        Returns the releases matching `specifier`, newest first.
+
+        :param specifier: PEP 440 specifier, e.g. '>=4.2,<5'. Empty matches everything.
+        :param prereleases: include pre-releases? By default they're only included
+            if the specifier itself mentions one.
+        :param include_yanked: include yanked releases?
+        :return: list of release versions
+        :raises InvalidSpecifier: if `specifier` can't be parsed
+        """
+        return list(self._iter_matches(specifier, prereleases, include_yanked))
+
+    def latest(
+        self,
+        specifier: str | SpecifierSet = "",
+        prereleases: bool = False,
+        include_yanked: bool = False,
+    ) -> str | None:
+        """
+        Returns the newest release matching `specifier`, e.g. the latest stable release,
+        or the latest 4.x release with '==4.*'.
+        """
+        return next(self._iter_matches(specifier, prereleases, include_yanked), None)
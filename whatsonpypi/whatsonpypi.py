@@ -1,15 +1,98 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterator, Sequence
 from typing import Any
 import webbrowser
 
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+from .artifacts import FILE_SECTIONS, artifact_key
+from .cache import DiskCache
 from .client import WoppClient, WoppResponse
+from .constants import DEFAULT_CACHE_TTL
 from .exceptions import (
     DocsNotFoundError,
     PageNotFoundError,
     URLLaunchError,
+    WoppError,
 )
-from .utils import clean_response
+from .offline import OfflineIndex
+from .ratelimit import RateLimiter
+from .requirements import PackagePin
+from .timings import RequestTimings
+from .utils import clean_response, get_human_size
+
+
+def make_client(
+    use_cache: bool = False,
+    cache_ttl: float = DEFAULT_CACHE_TTL,
+    offline_path: str | None = None,
+    index_url: str | None = None,
+    timing_hook: Callable[[RequestTimings], Any] | None = None,
+    server_url: str | None = None,
+    rate_limit: float | None = None,
+) -> WoppClient:
+    """
+    Returns a client set up to clean responses, optionally backed by the on-disk cache
+    or by a local mirror.
+
+    :param use_cache: should responses be cached on disk?
+    :param cache_ttl: seconds a cached response is used before being revalidated
+    :param offline_path: mirror directory or snapshot file to answer every lookup from
+    :param index_url: URL of the JSON API of the package index to query instead of PyPI
+    :param timing_hook: called with the timings of every request
+    :param server_url: URL of a `wopp --serve` process to ask first. If it isn't
+        running, or `offline_path`, `index_url` or `rate_limit` is given, lookups are
+        made directly instead.
+    :param rate_limit: most requests per second to send to the index
+    :return: WoppClient object
+    """
+    # the server answers from its own index, unpaced, so these options can only be met directly
+    if server_url and not (offline_path or index_url or rate_limit):
+        # the server module pulls in http.server, which plain lookups don't need
+        from .server import ServerClient
+
+        server = ServerClient(base_url=server_url, timing_hook=timing_hook)
+        if server.is_alive():
+            return server
+        server.transport.close()
+    if offline_path:
+        # everything is local already, so there is nothing to cache
+        return WoppClient(
+            request_hooks={"response": clean_response},
+            offline=OfflineIndex(offline_path),
+            base_url=index_url,
+            timing_hook=timing_hook,
+        )
+    cache = DiskCache(ttl=cache_ttl) if use_cache else None
+    return WoppClient(
+        request_hooks={"response": clean_response},
+        cache=cache,
+        base_url=index_url,
+        timing_hook=timing_hook,
+        rate_limiter=RateLimiter(rate=rate_limit) if rate_limit else None,
+    )
+
+
+def get_sections(more_out: bool, launch_docs: bool, open_page: bool) -> frozenset[str] | None:
+    """
+    Returns the sections of the project document an output mode needs.
+
+    :param more_out: should output contain more detail?
+    :param launch_docs: should doc URL be launched?
+    :param open_page: should the PyPI page be launched?
+    :return: section names, or None if the whole document is needed
+    """
+    if launch_docs or open_page:
+        # the URLs all live in `info`, so the releases walk can be skipped
+        return frozenset({"info"})
+    if more_out:
+        return None
+    # the files of the latest release (`urls`) are only shown with --more
+    return frozenset({"info", "releases"})
 
 
 def get_output(response: WoppResponse, more_out: bool = False) -> dict[str, Any]:
@@ -47,29 +130,28 @@ def get_output(response: WoppResponse, more_out: bool = False) -> dict[str, Any]
     return out_dict
 
 
-def run_query(
-    package: str,
-    version: str | None,
+def process_response(
+    response: WoppResponse,
     more_out: bool,
     launch_docs: bool,
     open_page: bool,
     history: int | None = None,
+    specifier: str | None = None,
+    prereleases: bool = False,
 ) -> dict[str, Any] | None:
     """
-    Run query against PyPI API and then do stuff based on user options.
+    Do stuff with a fetched response based on user options.
 
-    :param package: name of package
-    :param version: version of package
+    :param response: WoppResponse object to get the info
     :param more_out: should output contain more detail?
     :param launch_docs: should doc URL be launched?
     :param open_page: should the PyPI page be launched?
     :param history: show release history
+    :param specifier: only show releases matching this PEP 440 specifier
+    :param prereleases: should pre-releases be matched by the specifier?
 
     :return: output if available, or None
     """
-    client = WoppClient(request_hooks={"response": clean_response})
-    response = client.request(package=package.lower(), version=version)
-
     if launch_docs or open_page:
         if launch_docs:
             url = response.project_docs
@@ -82,13 +164,22 @@ def run_query(
         success = webbrowser.open(url)
         if not success:
             raise URLLaunchError
-    elif history is not None:
-        if history < 0:
+    elif history is not None or specifier:
+        if specifier:
+            # matching releases, newest first by PEP 440 ordering
+            sorted_releases = response.version_index.filter(
+                specifier, prereleases=prereleases or None
+            )
+        else:
+            sorted_releases = response.get_sorted_releases()
+        if history is None:
+            releases = sorted_releases
+        elif history < 0:
             # negative number means oldest releases.
-            releases = response.get_sorted_releases()[history:]
+            releases = sorted_releases[history:]
         else:
             # positive number means newest releases.
-            releases = response.get_sorted_releases()[:history]
+            releases = sorted_releases[:history]
         output = {}
         for release_version in releases:
             output[release_version] = response.get_release_info(release_version)
@@ -97,3 +188,253 @@ def run_query(
         return get_output(response, more_out=more_out)
 
     return None
+
+
+def run_query(
+    package: str,
+    version: str | None,
+    more_out: bool,
+    launch_docs: bool,
+    open_page: bool,
+    history: int | None = None,
+    client: WoppClient | None = None,
+    specifier: str | None = None,
+    prereleases: bool = False,
+) -> dict[str, Any] | None:
+    """
+    Run query against PyPI API and then do stuff based on user options.
+
+    :param package: name of package
+    :param version: version of package
+    :param more_out: should output contain more detail?
+    :param launch_docs: should doc URL be launched?
+    :param open_page: should the PyPI page be launched?
+    :param history: show release history
+    :param client: client to query with, see `make_client`
+    :param specifier: only show releases matching this PEP 440 specifier
+    :param prereleases: should pre-releases be matched by the specifier?
+
+    :return: output if available, or None
+    """
+    client = client or make_client()
+    response = client.request(
+        package=package.lower(),
+        version=version,
+        sections=get_sections(more_out, launch_docs, open_page),
+    )
+    return process_response(
+        response, more_out, launch_docs, open_page, history, specifier, prereleases
+    )
+
+
+def iter_queries(
+    packages: Sequence[tuple[str, str | None, str | None]],
+    more_out: bool,
+    launch_docs: bool,
+    open_page: bool,
+    history: int | None = None,
+    client: WoppClient | None = None,
+    prereleases: bool = False,
+) -> Iterator[tuple[int, dict[str, Any] | WoppError | None]]:
+    """
+    Run queries for several packages concurrently, yielding each result as soon as it is ready.
+
+    Takes the same arguments as `run_queries`.
+
+    :return: (input position, output, None or the error raised), in completion order
+    """
+    client = client or make_client()
+    responses = client.iter_many(
+        [(package.lower(), version) for package, version, _ in packages],
+        sections=get_sections(more_out, launch_docs, open_page),
+    )
+    for index, response in responses:
+        if isinstance(response, WoppError):
+            yield index, response
+            continue
+        try:
+            yield index, process_response(
+                response,
+                more_out,
+                launch_docs,
+                open_page,
+                history,
+                packages[index][2],
+                prereleases,
+            )
+        except WoppError as e:
+            yield index, e
+
+
+def run_queries(
+    packages: Sequence[tuple[str, str | None, str | None]],
+    more_out: bool,
+    launch_docs: bool,
+    open_page: bool,
+    history: int | None = None,
+    client: WoppClient | None = None,
+    prereleases: bool = False,
+) -> list[dict[str, Any] | WoppError | None]:
+    """
+    Run queries for several packages concurrently and do stuff based on user options.
+
+    :param packages: (name, version, specifier) of the packages to look up
+    :param more_out: should output contain more detail?
+    :param launch_docs: should doc URLs be launched?
+    :param open_page: should the PyPI pages be launched?
+    :param history: show release history
+    :param client: client to query with, see `make_client`
+    :param prereleases: should pre-releases be matched by the specifiers?
+
+    :return: output, None or the error raised, for each package in input order
+    """
+    results = dict(
+        iter_queries(packages, more_out, launch_docs, open_page, history, client, prereleases)
+    )
+    return [results[i] for i in range(len(packages))]
+
+
+def get_version_status(version: str | None, specifier: str | None, latest: str) -> str:
+    """
+    Compares what a requirement asks for against the latest release.
+
+    :param version: exact pinned version, if any
+    :param specifier: version specifier, if not pinned exactly
+    :param latest: latest version on PyPI
+    :return: short human-readable status
+    """
+    try:
+        if version:
+            return "up to date" if Version(version) >= Version(latest) else "outdated"
+        if specifier:
+            allowed = SpecifierSet(specifier).contains(latest, prereleases=True)
+            return "latest allowed" if allowed else "latest excluded"
+    except (InvalidVersion, InvalidSpecifier):
+        return "unknown"
+    return "unpinned"
+
+
+def iter_scan_packages(
+    pins: Sequence[PackagePin],
+    client: WoppClient | None = None,
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Like `scan_packages`, but yields each row as soon as its package has been looked up.
+
+    :return: (input position, row), in completion order
+    """
+    client = client or make_client()
+    # only the latest version is compared
+    responses = client.iter_many([name.lower() for name, _, _ in pins], sections={"info"})
+
+    for index, response in responses:
+        name, version, specifier = pins[index]
+        if isinstance(response, WoppError):
+            latest, status = "", "not found"
+        else:
+            latest = response.latest_version
+            status = get_version_status(version, specifier, latest) if latest else "unknown"
+        yield index, {
+            "package": name,
+            "current": version or specifier or "",
+            "latest": latest,
+            "status": status,
+        }
+
+
+def scan_packages(
+    pins: Sequence[PackagePin],
+    client: WoppClient | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Look up the latest version of every package concurrently and compare it with its pin.
+
+    :param pins: (name, version, specifier) of the packages, e.g. from `parse_requirements_file`
+    :param client: client to query with, see `make_client`
+    :return: one row per package, in input order
+    """
+    rows = dict(iter_scan_packages(pins, client))
+    return [rows[i] for i in range(len(pins))]
+
+
+def _dependency_map(response: WoppResponse) -> dict[str, str]:
+    """
+    Returns the requirements of a release keyed by package name and marker.
+    """
+    requirements = {}
+    for line in response.dependencies:
+        try:
+            requirement = Requirement(line)
+        except InvalidRequirement:
+            requirements[line] = line
+            continue
+        key: str = canonicalize_name(requirement.name)
+        if requirement.marker:
+            key += f"; {requirement.marker}"
+        requirements[key] = str(requirement)
+    return requirements
+
+
+def _diff_rows(field: str, old: dict[str, Any], new: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Returns a row for every key whose value was added, removed or changed.
+    """
+    rows = []
+    for key in sorted(old.keys() | new.keys()):
+        before, after = old.get(key), new.get(key)
+        if before == after:
+            continue
+        change = "added" if before is None else "removed" if after is None else "changed"
+        rows.append(
+            {"field": f"{field} {key}".strip(), "old": before, "new": after, "change": change}
+        )
+    return rows
+
+
+def diff_versions(
+    package: str,
+    old_version: str,
+    new_version: str,
+    client: WoppClient | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Compares two releases of a package.
+
+    Only the two version-specific documents are fetched, concurrently, and just
+    their `info` and files.
+
+    :param package: name of package
+    :param old_version: version to compare from
+    :param new_version: version to compare to
+    :param client: client to query with, see `make_client`
+    :return: one row (field, old, new, change) per difference
+    :raises WoppError: if either release couldn't be looked up
+    """
+    client = client or make_client()
+    responses = []
+    for result in client.request_many(
+        [(package.lower(), old_version), (package.lower(), new_version)],
+        sections=FILE_SECTIONS,
+    ):
+        if isinstance(result, WoppError):
+            raise result
+        responses.append(result)
+    old, new = responses
+
+    sizes = [{artifact_key(f["filename"]): f["size"] for f in r.files} for r in responses]
+    size_rows = _diff_rows("size", *sizes)
+    for row in size_rows:
+        if row["change"] == "changed":
+            row["change"] = f"{(row['new'] - row['old']) / row['old']:+.1%}" if row["old"] else ""
+        row["old"] = get_human_size(row["old"]) if row["old"] is not None else None
+        row["new"] = get_human_size(row["new"]) if row["new"] is not None else None
+
+    return [
+        *_diff_rows(
+            "",
+            {"requires_python": old.requires_python, "license": old.license},
+            {"requires_python": new.requires_python, "license": new.license},
+        ),
+        *_diff_rows("dependency", _dependency_map(old), _dependency_map(new)),
+        *size_rows,
+    ]